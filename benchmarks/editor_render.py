@@ -0,0 +1,95 @@
+"""Redaktor tabının render müddəti: köhnə (hər sətr üçün expander) və yeni (səhifələnmiş redaktor)
+
+İstifadə:
+    python benchmarks/editor_render.py [maddə sayı]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from maliyye import BudgetBook  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "smeta-hesablanmasi.py")
+# Kitab sessiyaya birbaşa verilir - tətbiq bazaya qoşulmasın
+os.environ["MALIYYE_DB"] = ""
+REGION = "Bakı"
+
+# Köhnə redaktor: hər maddə üçün expander, dörd sahə və iki düymə
+LEGACY_EDITOR = '''
+import streamlit as st
+
+region_to_edit = "Bakı"
+current_items = st.session_state.budget_data[region_to_edit].to_frame()
+for idx, row in current_items.iterrows():
+    with st.expander(f"Maddə {idx + 1}: {row['Maddənin Adı']}", expanded=False):
+        col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
+        with col1:
+            st.text_input("Nömrə:", value=row['Maddə Nömrəsi'], key=f"edit_number_{region_to_edit}_{idx}")
+        with col2:
+            st.text_input("Ad:", value=row['Maddənin Adı'], key=f"edit_name_{region_to_edit}_{idx}")
+        with col3:
+            st.number_input("Məbləğ:", value=float(row['Məbləğ']), min_value=0.0, step=10.0,
+                            format="%.2f", key=f"edit_amount_{region_to_edit}_{idx}")
+        with col4:
+            col4a, col4b = st.columns(2)
+            with col4a:
+                st.button("💾", key=f"update_item_{region_to_edit}_{idx}", help="Yenilə")
+            with col4b:
+                st.button("🗑️", key=f"delete_item_{region_to_edit}_{idx}", help="Sil")
+'''
+
+
+def make_book(item_count):
+    """Bir rayonda `item_count` maddəli sintetik büdcə"""
+    book = BudgetBook()
+    region = book.get_or_create(REGION, item_count * 1000.0)
+    region.add_items(pd.DataFrame({
+        'Maddə Nömrəsi': [f"M-{i}" for i in range(item_count)],
+        'Maddənin Adı': [f"Maddə {i}" for i in range(item_count)],
+        'Məbləğ': [100.0] * item_count,
+    }))
+    return book
+
+
+def count_elements(node):
+    """Render olunmuş elementlərin sayı"""
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def time_run(app, book):
+    app.session_state.budget_data = book
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return elapsed, count_elements(app._tree)
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    book = make_book(item_count)
+
+    legacy_time, legacy_elements = time_run(
+        AppTest.from_string(LEGACY_EDITOR, default_timeout=600), book
+    )
+    app = AppTest.from_file(APP_PATH, default_timeout=600)
+    app.session_state.edit_region_select = REGION
+    new_time, new_elements = time_run(app, book)
+
+    print(f"{item_count} maddə, rayon: {REGION}")
+    print(f"  Köhnə redaktor: {legacy_time:8.3f} s, {legacy_elements} element")
+    print(f"  Yeni redaktor:  {new_time:8.3f} s, {new_elements} element (bütün tətbiq)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Əsas əməliyyatların müddəti sintetik büdcə üzərində (78 rayon, 10-10 000 maddə)
+
+Ölçülür: toplu və tək maddə əlavəsi, redaktə, faizlərin hesablanması, Excel ixracı
+və idxalı, snapshot (pyarrow varsa), ümumi baxış, ssenari, indeks və axtarış. Nəticələr JSON kimi saxlanıla və əvvəlki nəticə ilə
+müqayisə edilə bilər - hər hansı əməliyyat icazə veriləndən çox yavaşlayıbsa
+skript 1 kodu ilə çıxır.
+
+İstifadə:
+    python benchmarks/hot_paths.py [--min-items 10] [--max-items 10000] [--db]
+        [--json nəticə.json] [--baseline köhnə.json --tolerance 0.25]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from maliyye import REGIONS, BudgetBook, RegionBudget, SqliteStore, WorkbookExporter  # noqa: E402
+from maliyye.excel_io import import_workbook  # noqa: E402
+from maliyye.scenario import Scenario, compare_scenarios  # noqa: E402
+from maliyye.snapshot import load_snapshot, save_snapshot, snapshot_available  # noqa: E402
+
+
+def synthetic_items(count, rng):
+    """`count` maddəli sintetik cədvəl (Məbləğ AZN ilə)"""
+    return pd.DataFrame({
+        'Maddə Nömrəsi': [f"{i // 100 + 1}.{i % 100 + 1}" for i in range(count)],
+        'Maddənin Adı': [f"Maddə {i}" for i in range(count)],
+        'Məbləğ': np.round(rng.uniform(10, 5000, count), 2),
+    })
+
+
+def region_sizes(min_items, max_items, region_count=len(REGIONS)):
+    """Rayonların maddə sayları - min və maks arasında loqarifmik paylanmış"""
+    return np.geomspace(min_items, max_items, region_count).round().astype(int)
+
+
+def synthetic_frames(min_items, max_items, seed=0):
+    """{rayon: (maddələr, ümumi büdcə)} - büdcələr maddələrin cəmindən 10% artıqdır"""
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for name, count in zip(REGIONS, region_sizes(min_items, max_items)):
+        items_df = synthetic_items(count, rng)
+        frames[name] = (items_df, round(items_df['Məbləğ'].sum() * 1.1, 2))
+    return frames
+
+
+class Timer:
+    """Əməliyyatların müddətini toplayır: ad -> (say, cəmi saniyə)"""
+
+    def __init__(self):
+        self.results = {}
+
+    def measure(self, name, func, count=1):
+        start = time.perf_counter()
+        result = func()
+        self.results[name] = (count, time.perf_counter() - start)
+        return result
+
+
+def run(min_items, max_items, db_path=None, seed=0):
+    frames = synthetic_frames(min_items, max_items, seed)
+    total_items = sum(len(items_df) for items_df, _ in frames.values())
+    timer = Timer()
+    book = BudgetBook(store=SqliteStore(db_path) if db_path else None)
+    rng = np.random.default_rng(seed + 1)
+
+    def bulk_add():
+        regions = {}
+        for name, (items_df, total_budget) in frames.items():
+            region = RegionBudget(name, total_budget)
+            region.add_items(items_df)
+            regions[name] = region
+        book.update(regions)
+
+    timer.measure("toplu əlavə", bulk_add, total_items)
+
+    regions = book.values()
+    for region in regions:
+        # Tək əlavələr üçün yer
+        region.set_total_budget(region.total_budget + 1000)
+
+    def add_items():
+        for region in regions:
+            region.add_item("99.1", "Yeni maddə", 10.0)
+
+    timer.measure("maddə əlavəsi", add_items, len(regions))
+
+    def edit_items():
+        for region in regions:
+            idx = int(rng.integers(len(region)))
+            number, name, amount = region.items.get(idx)
+            region.update_item(idx, number, name, amount / 100 * 0.9)
+
+    timer.measure("maddə redaktəsi", edit_items, len(regions))
+
+    def edit_pages():
+        for region in regions:
+            page = range(min(len(region), 25))
+            region.apply_edits({idx: (region.numbers[idx], "Redaktə", 1.0) for idx in page})
+
+    timer.measure("səhifə redaktəsi (25 sətr)", edit_pages, len(regions))
+
+    timer.measure("faizlər", lambda: [region.percentages() for region in regions], len(regions))
+    timer.measure("göstərilən cədvəl", lambda: [region.display_frame() for region in regions], len(regions))
+    timer.measure("ümumi baxış", lambda: (book.aggregates.frame(), book.top_items(10)))
+
+    timer.measure("indeksin qurulması", book.item_index)
+    timer.measure("axtarış (bütün rayonlar)", lambda: [book.search(query) for query in ("1.5", "maddə 12")], 2)
+    timer.measure("nömrə üzrə cəmlər", book.rollup)
+
+    scenario = Scenario("Kəsir")
+    scenario.add_step('budget', percent=-10)
+    scenario.add_step('fit')
+    timer.measure("ssenari (bütün rayonlar)", lambda: compare_scenarios(book, [scenario]), len(regions))
+
+    exporter = WorkbookExporter()
+    data = timer.measure("Excel ixracı", lambda: exporter.export(book))
+    regions[0].add_item("99.2", "Yeni maddə", 10.0)
+    timer.measure("Excel ixracı (1 rayon dəyişib)", lambda: exporter.export(book))
+    imported, warnings = timer.measure("Excel idxalı", lambda: import_workbook(io.BytesIO(data)))
+    if len(imported) != len(regions) or warnings:
+        raise RuntimeError(f"İdxal uyğun gəlmir: {len(imported)} rayon, xəbərdarlıqlar: {warnings}")
+
+    if snapshot_available():
+        snapshot = io.BytesIO()
+        timer.measure("snapshot yazılması", lambda: save_snapshot(book, snapshot))
+        timer.measure("snapshot yüklənməsi", lambda: load_snapshot(io.BytesIO(snapshot.getvalue())))
+        timer.measure(
+            "snapshot yüklənməsi (1 rayon)",
+            lambda: load_snapshot(io.BytesIO(snapshot.getvalue()), [regions[-1].name])
+        )
+
+    return {'regions': len(regions), 'items': total_items, 'results': timer.results}
+
+
+def compare(results, baseline, tolerance):
+    """Əvvəlki nəticədən `tolerance` qədərdən çox yavaşlamış əməliyyatlar"""
+    regressions = []
+    for name, (_, elapsed) in results.items():
+        if name in baseline and elapsed > baseline[name][1] * (1 + tolerance):
+            regressions.append((name, baseline[name][1], elapsed))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-items", type=int, default=10)
+    parser.add_argument("--max-items", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", action="store_true", help="müvəqqəti SQLite bazası ilə ölç")
+    parser.add_argument("--json", help="nəticələri bu fayla yaz")
+    parser.add_argument("--baseline", help="müqayisə üçün əvvəlki JSON nəticə")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="icazə verilən yavaşlama (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "benchmark.db") if args.db else None
+        report = run(args.min_items, args.max_items, db_path, args.seed)
+
+    print(f"{report['regions']} rayon, {report['items']} maddə ({args.min_items}-{args.max_items})"
+          + (", SQLite" if args.db else ""))
+    for name, (count, elapsed) in report['results'].items():
+        per_op = f"{elapsed / count * 1e6:10.1f} µs/əməliyyat" if count > 1 else ""
+        print(f"  {name:<32} {elapsed * 1000:10.2f} ms {per_op}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)['results']
+        regressions = compare(report['results'], baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"⚠️ {name}: {before * 1000:.2f} ms → {after * 1000:.2f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Maliyyə Sistemi - büdcə hesablama mühərriki
+
+Adlar ilk müraciətdə yüklənir ki, əmr sətri (`python -m maliyye`) pandas və
+numpy-ı yalnız lazım olduqda idxal etsin.
+"""
+import importlib
+
+_EXPORTS = {
+    "REGIONS": "engine",
+    "COLUMNS": "engine",
+    "REQUIRED_COLUMNS": "engine",
+    "BudgetBook": "engine",
+    "RegionBudget": "engine",
+    "calculate_percentage": "engine",
+    "calculate_percentages": "engine",
+    "format_percentage": "engine",
+    "parse_pasted_items": "engine",
+    "validate_budget": "engine",
+    "ItemBuffer": "buffer",
+    "RegionJournal": "journal",
+    "BookIndex": "index",
+    "BudgetStore": "storage",
+    "SqliteStore": "storage",
+    "WorkbookExporter": "excel_io",
+    "Scenario": "scenario",
+    "save_snapshot": "snapshot",
+    "load_snapshot": "snapshot",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,101 @@
+"""Rayonlar üzrə saxlanılan cəmlər - ümumi baxış üçün"""
+import numpy as np
+import pandas as pd
+
+from .cache import next_version
+from .money import share, shares, share_to_percentage, to_azn
+
+# Ümumi baxış cədvəlinin sütunları
+SUMMARY_COLUMNS = ['Rayon', 'Ümumi Büdcə', 'İstifadə Edilən', 'Qalan Büdcə', 'Faiz', 'Maddə Sayı', 'Büdcə Aşılıb']
+TOP_ITEM_COLUMNS = ['Rayon', 'Maddə Nömrəsi', 'Maddənin Adı', 'Məbləğ']
+
+
+class BookAggregates:
+    """Hər rayonun (ümumi büdcə, istifadə edilən, maddə sayı) göstəriciləri (qəpiklə)
+
+    RegionBudget dinləyicisi kimi qoşulur və hər dəyişiklikdən sonra yalnız həmin
+    rayonun sətrini yeniləyir - ümumi baxış üçün rayonları yenidən toplamaq lazım deyil.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._top_items = {}
+        # Hər dəyişiklikdə artır (ümumi baxış keşləri üçün açar)
+        self.version = next_version()
+
+    def __call__(self, region, op, *args):
+        self.track(region)
+
+    def track(self, region):
+        """Rayonun göstəricilərini yenilə (O(1) - rayon öz cəmini saxlayır)"""
+        self.stats[region.name] = (region.total_qepik, region.used_qepik, len(region))
+        self.version = next_version()
+
+    def seed(self, rows):
+        """(rayon, ümumi büdcə, istifadə edilən, maddə sayı) sətrlərindən doldur (qəpiklə)"""
+        for name, total_qepik, used_qepik, item_count in rows:
+            self.stats[name] = (int(total_qepik), int(used_qepik), int(item_count))
+        self.version = next_version()
+
+    def drop(self, name):
+        self.stats.pop(name, None)
+        self._top_items.pop(name, None)
+        self.version = next_version()
+
+    def totals(self):
+        """Bütün rayonlar üzrə cəmlər (dəqiq, qəpiklə toplanır)"""
+        total_qepik = sum(stat[0] for stat in self.stats.values())
+        used_qepik = sum(stat[1] for stat in self.stats.values())
+        return {
+            'total_budget': to_azn(total_qepik),
+            'used_amount': to_azn(used_qepik),
+            'remaining_budget': to_azn(total_qepik - used_qepik),
+            'used_percentage': share_to_percentage(share(used_qepik, total_qepik)),
+            'item_count': sum(stat[2] for stat in self.stats.values()),
+            'over_budget_count': sum(1 for stat in self.stats.values() if stat[1] > stat[0]),
+        }
+
+    def frame(self):
+        """Rayonlar üzrə xülasə cədvəli (rəqəm kimi, məbləğlər AZN)"""
+        if not self.stats:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        names = list(self.stats)
+        total_qepik, used_qepik, item_count = (
+            np.array(column, dtype=np.int64) for column in zip(*self.stats.values())
+        )
+        return pd.DataFrame({
+            'Rayon': names,
+            'Ümumi Büdcə': to_azn(total_qepik),
+            'İstifadə Edilən': to_azn(used_qepik),
+            'Qalan Büdcə': to_azn(total_qepik - used_qepik),
+            'Faiz': share_to_percentage(shares(used_qepik, total_qepik)),
+            'Maddə Sayı': item_count,
+            'Büdcə Aşılıb': used_qepik > total_qepik,
+        }, columns=SUMMARY_COLUMNS)
+
+    def region_top_items(self, region, n):
+        """Rayonun ən böyük `n` maddəsi, məbləğ qəpiklə (rayon versiyasına görə keşlənir)"""
+        cached = self._top_items.get(region.name)
+        if cached is None or cached[0] != (region.version, n):
+            amounts = region.amounts
+            if len(amounts) > n:
+                indices = np.argpartition(amounts, -n)[-n:]
+            else:
+                indices = np.arange(len(amounts))
+            rows = [
+                (region.name, region.numbers[idx], region.names[idx], int(amounts[idx]))
+                for idx in indices
+            ]
+            cached = ((region.version, n), rows)
+            self._top_items[region.name] = cached
+        return cached[1]
+
+
+def top_items_frame(rows, n):
+    """(rayon, nömrə, ad, məbləğ qəpiklə) sətrlərindən ən böyük `n` maddə (AZN ilə)"""
+    # Sətr olmadıqda sütun object tipində olur və nlargest onu qəbul etmir
+    top_df = pd.DataFrame(rows, columns=TOP_ITEM_COLUMNS).astype({'Məbləğ': np.int64})
+    top_df = top_df.nlargest(n, 'Məbləğ').reset_index(drop=True)
+    top_df['Məbləğ'] = to_azn(top_df['Məbləğ'].to_numpy())
+    return top_df
+
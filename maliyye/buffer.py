@@ -0,0 +1,120 @@
+"""Maddələr üçün əlavəyə uyğun sütunlu bufer"""
+import numpy as np
+
+
+class ItemBuffer:
+    """Genişlənən sütunlu bufer - əlavə amortizasiya olunmuş O(1)"""
+
+    MIN_CAPACITY = 16
+
+    def __init__(self, capacity=MIN_CAPACITY):
+        capacity = max(int(capacity), self.MIN_CAPACITY)
+        self._numbers = np.empty(capacity, dtype=object)
+        self._names = np.empty(capacity, dtype=object)
+        # Məbləğlər qəpiklə
+        self._amounts = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._amounts)
+
+    # Doldurulmuş hissəyə baxış (kopyasız)
+    @property
+    def numbers(self):
+        return self._numbers[:self._size]
+
+    @property
+    def names(self):
+        return self._names[:self._size]
+
+    @property
+    def amounts(self):
+        return self._amounts[:self._size]
+
+    def _reserve(self, needed):
+        """Tutumu ən azı `needed`-ə qədər ikiqat artır"""
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for attr in ('_numbers', '_names', '_amounts'):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, attr, new)
+
+    def _check_index(self, idx):
+        if not 0 <= idx < self._size:
+            raise IndexError(f"Maddə indeksi {idx} mövcud deyil")
+
+    def append(self, number, name, amount):
+        """Bir maddə əlavə et"""
+        self._reserve(self._size + 1)
+        self._numbers[self._size] = number
+        self._names[self._size] = name
+        self._amounts[self._size] = amount
+        self._size += 1
+
+    def extend(self, numbers, names, amounts):
+        """Bir neçə maddəni birdən əlavə et"""
+        count = len(amounts)
+        self._reserve(self._size + count)
+        end = self._size + count
+        self._numbers[self._size:end] = np.asarray(numbers, dtype=object)
+        self._names[self._size:end] = np.asarray(names, dtype=object)
+        self._amounts[self._size:end] = np.asarray(amounts, dtype=np.int64)
+        self._size = end
+
+    def get(self, idx):
+        """Maddəni (nömrə, ad, məbləğ) kimi qaytar"""
+        self._check_index(idx)
+        return self._numbers[idx], self._names[idx], int(self._amounts[idx])
+
+    def set(self, idx, number, name, amount):
+        """Maddəni yerində yenilə"""
+        self._check_index(idx)
+        self._numbers[idx] = number
+        self._names[idx] = name
+        self._amounts[idx] = amount
+
+    def insert(self, idx, number, name, amount):
+        """Maddəni verilmiş mövqeyə yerləşdir - sonrakı maddələr sağa sürüşdürülür"""
+        if not 0 <= idx <= self._size:
+            raise IndexError(f"Maddə indeksi {idx} mövcud deyil")
+        self._reserve(self._size + 1)
+        for arr in (self._numbers, self._names, self._amounts):
+            arr[idx + 1:self._size + 1] = arr[idx:self._size]
+        self._numbers[idx] = number
+        self._names[idx] = name
+        self._amounts[idx] = amount
+        self._size += 1
+
+    def truncate(self, size):
+        """`size`-dan sonrakı maddələri sil"""
+        if not 0 <= size <= self._size:
+            raise IndexError(f"Maddə indeksi {size} mövcud deyil")
+        self._numbers[size:self._size] = None
+        self._names[size:self._size] = None
+        self._amounts[size:self._size] = 0
+        self._size = size
+
+    def delete(self, idx):
+        """Maddəni sil - sonrakı maddələr bir mövqe sola sürüşdürülür"""
+        self._check_index(idx)
+        last = self._size - 1
+        for arr in (self._numbers, self._names, self._amounts):
+            arr[idx:last] = arr[idx + 1:self._size]
+        self._numbers[last] = None
+        self._names[last] = None
+        self._amounts[last] = 0
+        self._size = last
+
+    @classmethod
+    def from_arrays(cls, numbers, names, amounts):
+        """Hazır sütunlardan bufer yarat"""
+        buffer = cls(len(amounts))
+        buffer.extend(numbers, names, amounts)
+        return buffer
@@ -0,0 +1,78 @@
+"""Versiyaya görə açarlanan LRU keş - törəmə cədvəllər, qrafiklər və s. üçün"""
+import itertools
+import threading
+from collections import OrderedDict
+
+# Bütün proses üçün ortaq, artan versiya sayğacı - versiyalar heç vaxt təkrarlanmır,
+# ona görə keş sessiyalar arasında paylaşıla bilər
+_VERSIONS = itertools.count(1)
+
+
+def next_version():
+    return next(_VERSIONS)
+
+
+class VersionedCache:
+    """(növ, rayon, versiya) açarlı, ölçüsü məhdud LRU keş
+
+    Rayonun versiyası dəyişdikdə həmin (növ, rayon) üçün köhnə nəticə dərhal
+    silinir, çünki ona bir daha müraciət olunmayacaq.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._latest = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, kind, name, version, compute, *params):
+        """Keşdən qaytar və ya `compute()` ilə hesabla
+
+        `params` eyni versiya daxilində fərqli nəticələri ayırır (səhifə, axtarış və s.).
+        """
+        key = (kind, name, version) + params
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            latest = self._latest.get((kind, name))
+            if latest is not None and latest < version:
+                for old_key in [k for k in self._entries if k[:3] == (kind, name, latest)]:
+                    del self._entries[old_key]
+                    self.evictions += 1
+            if latest is None or latest <= version:
+                self._latest[(kind, name)] = version
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+
+    def stats(self):
+        """Keş statistikası"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,170 @@
+"""Əmr sətri - Streamlit olmadan doğrulama, faiz hesablanması və ixrac
+
+Nümunələr:
+    python -m maliyye check rayonlar/*.xlsx
+    python -m maliyye export rayonlar/*.xlsx rayonlar/*.csv -o yekun.xlsx
+    python -m maliyye export yekun.xlsx -o yekun.parquet
+    python -m maliyye check yekun.parquet --region Bakı --region Quba
+"""
+import argparse
+import os
+import sys
+
+from .rules import CONFLICT_RULES
+
+# Ağır kitabxanalar (pandas, numpy, openpyxl) yalnız əmr icra olunarkən yüklənir
+
+
+def load_csv(path):
+    """CSV faylından rayonları oxu
+
+    'Rayon' sütunu varsa hər rayon ayrıca götürülür, yoxdursa rayon adı fayl
+    adıdır. Ümumi büdcə Excel ixracında olduğu kimi 'Ümumi Büdcə' sətrindən oxunur.
+    """
+    import pandas as pd
+
+    from .excel_io import parse_region_sheet
+
+    df = pd.read_csv(path)
+    if 'Rayon' in df.columns:
+        groups = df.groupby('Rayon', sort=False)
+    else:
+        groups = [(os.path.splitext(os.path.basename(path))[0], df)]
+
+    regions = {}
+    for name, group in groups:
+        region = parse_region_sheet(name, group.reset_index(drop=True))
+        if region is not None:
+            regions[name] = region
+    return regions
+
+
+def load_book(paths, conflict='replace', jobs=None, regions=None):
+    """Faylları kitaba yüklə - (BudgetBook, [xəta mesajı]) qaytarır
+
+    `regions` verilərsə yalnız həmin rayonlar saxlanılır (snapshot-lardan yalnız
+    onlar oxunur).
+    """
+    from .engine import BudgetBook
+    from .excel_io import import_files
+    from .snapshot import SNAPSHOT_EXTENSION, load_snapshot
+
+    book = BudgetBook()
+    errors = []
+    snapshot_paths = [path for path in paths if path.lower().endswith(SNAPSHOT_EXTENSION)]
+    csv_paths = [path for path in paths if path.lower().endswith('.csv')]
+    excel_paths = [path for path in paths if path not in snapshot_paths and path not in csv_paths]
+
+    if excel_paths:
+        _, results = import_files(
+            [(path, path) for path in excel_paths], book=book, conflict=conflict, max_workers=jobs
+        )
+        for result in results:
+            if result.error:
+                errors.append(f"{result.name}: {result.error}")
+            for sheet, error in result.warnings:
+                errors.append(f"{result.name} [{sheet}]: {error}")
+
+    for path in csv_paths:
+        try:
+            loaded = load_csv(path)
+        except Exception as e:
+            errors.append(f"{path}: {e}")
+            continue
+        _add_regions(book, loaded, conflict)
+
+    for path in snapshot_paths:
+        try:
+            loaded = load_snapshot(path, regions)
+        except Exception as e:
+            errors.append(f"{path}: {e}")
+            continue
+        _add_regions(book, loaded, conflict)
+
+    if regions is not None:
+        for name in [name for name in book.keys() if name not in regions]:
+            del book[name]
+    return book, errors
+
+
+def _add_regions(book, regions, conflict):
+    if conflict == 'keep':
+        regions = {name: region for name, region in regions.items() if name not in book}
+    book.update(regions)
+
+
+def check_book(book, out=None, err=None):
+    """Bütün rayonları doğrula - xülasə `out`-a, xətalar `err`-ə yazılır; xəta sayını qaytarır"""
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    errors = book.validate_all()
+    for name, region in book.items():
+        status = "XƏTA" if name in errors else "OK"
+        out.write(
+            f"{status:4}  {name}: {len(region)} maddə, "
+            f"{region.used_amount:,.2f} / {region.total_budget:,.2f} AZN "
+            f"({region.used_percentage}%)\n"
+        )
+    for name, error_msg in errors.items():
+        err.write(f"{name}: {error_msg}\n")
+    return len(errors)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="maliyye",
+        description="Büdcə fayllarının doğrulanması və birləşdirilmiş ixracı",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_inputs(subparser):
+        subparser.add_argument("files", nargs="+", help="Excel (.xlsx/.xls), CSV və ya snapshot (.parquet) faylları")
+        subparser.add_argument(
+            "--conflict", choices=CONFLICT_RULES, default="replace",
+            help="eyni rayon bir neçə faylda olduqda qayda (standart: replace)"
+        )
+        subparser.add_argument("-j", "--jobs", type=int, default=None, help="paralel proses sayı")
+        subparser.add_argument(
+            "-r", "--region", action="append", dest="regions", default=None,
+            help="yalnız bu rayon (bir neçə dəfə verilə bilər)"
+        )
+
+    check = subparsers.add_parser("check", help="rayonları doğrula")
+    add_inputs(check)
+
+    export = subparsers.add_parser("export", help="doğrula və birləşdirilmiş Excel faylı yaz")
+    add_inputs(export)
+    export.add_argument("-o", "--output", required=True, help="nəticə .xlsx və ya .parquet (snapshot) faylı")
+    export.add_argument(
+        "--strict", action="store_true", help="doğrulama xətası olduqda fayl yazılmasın"
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    book, load_errors = load_book(args.files, conflict=args.conflict, jobs=args.jobs, regions=args.regions)
+    for error in load_errors:
+        sys.stderr.write(f"Fayl oxunmadı - {error}\n")
+    if not book:
+        sys.stderr.write("Heç bir uyğun məlumat tapılmadı!\n")
+        return 2
+
+    error_count = check_book(book)
+
+    if args.command == "export":
+        if error_count and args.strict:
+            sys.stderr.write("Doğrulama xətaları səbəbindən fayl yazılmadı.\n")
+            return 1
+        from .excel_io import WorkbookExporter
+        from .snapshot import SNAPSHOT_EXTENSION, save_snapshot
+
+        if args.output.lower().endswith(SNAPSHOT_EXTENSION):
+            save_snapshot(book, args.output)
+        else:
+            with open(args.output, "wb") as output:
+                output.write(WorkbookExporter().export(book))
+        print(f"{len(book)} rayon {args.output} faylına yazıldı.")
+
+    return 1 if error_count or load_errors else 0
@@ -0,0 +1,693 @@
+"""Büdcə mühərriki - Streamlit-dən asılı olmayan hesablama qatı"""
+import io
+from contextlib import ExitStack, contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import BookAggregates, top_items_frame
+from .buffer import ItemBuffer
+from .cache import next_version
+from .index import BookIndex, rollup_frame, search_frame
+from .journal import RegionJournal
+from .money import (
+    FULL_SHARE,
+    allocate_shares,
+    share,
+    share_to_percentage,
+    to_azn,
+    to_qepik,
+    to_qepik_array,
+)
+
+# Rayonların siyahısı
+REGIONS = [
+    "Aparat", "Abşeron", "Ağcabədi", "Ağdam", "Ağdaş", "Ağdərə", "Ağstafa", "Ağsu", 
+    "Astara", "Bakı", "Babək (Naxçıvan MR)", "Balakən", "Bərdə", "Beyləqan", "Biləsuvar", 
+    "Cəbrayıl", "Cəlilabad", "Culfa (Naxçıvan MR)", "Daşkəsən", "Füzuli", "Gədəbəy", 
+    "Gəncə", "Goranboy", "Göyçay", "Göygöl", "Hacıqabul", "Xaçmaz", "Xankəndi", "Xızı", 
+    "Xocalı", "Xocavənd", "İmişli", "İsmayıllı", "Kəlbəcər", "Kəngərli (Naxçıvan MR)", 
+    "Kürdəmir", "Laçın", "Lənkəran", "Lerik", "Masallı", "Mingəçevir", "Naftalan", 
+    "Neftçala", "Naxçıvan", "Oğuz", "Siyəzən", "Ordubad (Naxçıvan MR)", "Qəbələ", 
+    "Qax", "Qazax", "Qobustan", "Quba", "Qubadlı", "Qusar", "Saatlı", "Sabirabad", 
+    "Sədərək (Naxçıvan MR)", "Salyan", "Samux", "Şabran", "Şahbuz (Naxçıvan MR)", 
+    "Şamaxı", "Şəki", "Şəmkir", "Şərur (Naxçıvan MR)", "Şirvan", "Şuşa", "Sumqayıt", 
+    "Tərtər", "Tovuz", "Ucar", "Yardımlı", "Yevlax", "Zaqatala", "Zəngilan", "Zərdab", 
+    "Nabran", "Xudat"
+]
+
+# Maddə cədvəlinin sütunları
+COLUMNS = ['Maddə Nömrəsi', 'Maddənin Adı', 'Məbləğ', 'Faiz']
+REQUIRED_COLUMNS = COLUMNS[:3]
+
+
+def calculate_percentage(amount, total):
+    """Faiz hesablama funksiyası (AZN məbləğləri qəpiklə, nəticə 0.01%-ə yarım yuxarı)"""
+    return share_to_percentage(share(to_qepik(amount), to_qepik(total)))
+
+
+def calculate_percentages(amounts, total):
+    """Maddələrin faizləri - cəmləri cəmin faizinə dəqiq bərabər (ən böyük qalıq üsulu)"""
+    return share_to_percentage(allocate_shares(to_qepik_array(amounts), to_qepik(total)))
+
+
+def format_percentage(percentage):
+    """Faizi göstərmək üçün sətrə çevir"""
+    return f"{percentage}%"
+
+
+def parse_pasted_items(text):
+    """Excel-dən kopyalanmış sətrləri (tab ilə ayrılmış) DataFrame-ə çevir"""
+    items_df = pd.read_csv(
+        io.StringIO(text.strip()),
+        sep='\t',
+        header=None,
+        names=REQUIRED_COLUMNS,
+        dtype={'Maddə Nömrəsi': str, 'Maddənin Adı': str},
+    )
+    items_df['Məbləğ'] = pd.to_numeric(
+        items_df['Məbləğ'].astype(str).str.replace(',', '', regex=False), errors='coerce'
+    )
+    return items_df
+
+
+def validate_budget(items_df, total_budget):
+    """Büdcə doğrulama funksiyası"""
+    if items_df.empty:
+        return True, ""
+    
+    total_items = int(to_qepik_array(pd.to_numeric(items_df['Məbləğ'])).sum())
+    return _check_total(total_items, to_qepik(total_budget))
+
+
+def _check_total(total_items, total_budget):
+    """Maddələrin cəmini ümumi büdcə ilə müqayisə et (hər ikisi qəpiklə)"""
+    if total_items > total_budget:
+        return False, f"Xəta: Maddələrin cəmi ({to_azn(total_items):,.2f} AZN) ümumi büdcədən ({to_azn(total_budget):,.2f} AZN) çoxdur!"
+    return True, ""
+
+
+class RegionBudget:
+    """Bir rayonun büdcəsi - maddələr tipli sütunlarda saxlanılır
+
+    Məbləğlər daxildə qəpiklə (int64) saxlanılır, cəmlər dəqiqdir; `total_budget`,
+    `used_amount` və s. xassələr AZN qaytarır.
+    """
+
+    def __init__(self, name, total_budget=0.0):
+        self.name = name
+        self.total_qepik = to_qepik(total_budget)
+        self.items = ItemBuffer()
+        self.used_qepik = 0
+        # Hər dəyişiklikdə artan versiya (keşlər üçün açar)
+        self.version = next_version()
+        # Dəyişiklik dinləyiciləri: listener(region, op, *args)
+        self.listeners = []
+        self._batch_depth = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getstate__(self):
+        # Dinləyicilər (saxlama qatı və s.) başqa prosesə ötürülmür
+        state = self.__dict__.copy()
+        state['listeners'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Başqa prosesdə verilmiş versiya bu prosesin sayğacı ilə toqquşmasın
+        self.version = next_version()
+
+    @property
+    def numbers(self):
+        return self.items.numbers
+
+    @property
+    def names(self):
+        return self.items.names
+
+    @property
+    def amounts(self):
+        """Maddələrin məbləğləri (qəpik, int64)"""
+        return self.items.amounts
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def total_budget(self):
+        return to_azn(self.total_qepik)
+
+    @property
+    def used_amount(self):
+        return to_azn(self.used_qepik)
+
+    @property
+    def remaining_budget(self):
+        return to_azn(self.total_qepik - self.used_qepik)
+
+    @property
+    def used_share(self):
+        """İstifadə edilən pay (0.01% vahidində)"""
+        return share(self.used_qepik, self.total_qepik)
+
+    @property
+    def used_percentage(self):
+        return share_to_percentage(self.used_share)
+
+    @property
+    def remaining_percentage(self):
+        if self.total_qepik <= 0:
+            return 0
+        return share_to_percentage(FULL_SHARE - self.used_share)
+
+    @property
+    def over_budget(self):
+        return self.used_qepik > self.total_qepik
+
+    def _notify(self, op, *args):
+        """Versiyanı artır və dinləyicilərə dəyişikliyi bildir"""
+        if op != 'commit':
+            self.version = next_version()
+        for listener in self.listeners:
+            listener(self, op, *args)
+
+    def _refresh_totals(self):
+        """Əvvəlcədən hesablanmış cəmləri tam yenidən hesabla"""
+        self.used_qepik = int(self.amounts.sum())
+
+    def percentages(self):
+        """Hər maddənin faizi (rəqəm kimi) - cəmi istifadə edilən faizə bərabərdir"""
+        return share_to_percentage(allocate_shares(self.amounts, self.total_qepik))
+
+    def summary(self):
+        """Rayonun xülasə göstəriciləri (rəqəm kimi)"""
+        return {
+            'total_budget': self.total_budget,
+            'used_amount': self.used_amount,
+            'remaining_budget': self.remaining_budget,
+            'used_percentage': self.used_percentage,
+            'remaining_percentage': self.remaining_percentage,
+            'over_budget': self.over_budget,
+        }
+
+    def validate(self, total_budget=None):
+        """Maddələrin cəmini büdcə ilə yoxla"""
+        total_qepik = self.total_qepik if total_budget is None else to_qepik(total_budget)
+        if self.empty:
+            return True, ""
+        return _check_total(self.used_qepik, total_qepik)
+
+    def set_total_budget(self, total_budget):
+        """Ümumi büdcəni dəyiş"""
+        total_qepik = to_qepik(total_budget)
+        if total_qepik != self.total_qepik:
+            self.apply_change('set_budget', total_qepik)
+
+    def add_item(self, number, name, amount):
+        """Yeni maddə əlavə et - büdcə aşılarsa maddə əlavə edilmir"""
+        amount = to_qepik(amount)
+        is_valid, error_msg = _check_total(self.used_qepik + amount, self.total_qepik)
+        if not is_valid:
+            return False, error_msg
+
+        self.apply_change('add', [number], [name], [amount])
+        return True, ""
+
+    def add_items(self, items_df):
+        """Bir neçə maddəni birdən əlavə et - büdcə aşılarsa heç biri əlavə edilmir"""
+        if items_df.empty:
+            return True, ""
+        amounts = pd.to_numeric(items_df['Məbləğ']).to_numpy(dtype=np.float64)
+        if np.isnan(amounts).any() or (amounts <= 0).any():
+            return False, "Xəta: Bütün maddələrin məbləği müsbət ədəd olmalıdır!"
+        if items_df['Maddə Nömrəsi'].isna().any() or items_df['Maddənin Adı'].isna().any():
+            return False, "Xəta: Bütün maddələrin nömrəsi və adı doldurulmalıdır!"
+
+        amounts = to_qepik_array(amounts)
+        is_valid, error_msg = _check_total(self.used_qepik + int(amounts.sum()), self.total_qepik)
+        if not is_valid:
+            return False, error_msg
+
+        self.apply_change(
+            'add',
+            items_df['Maddə Nömrəsi'].to_numpy(dtype=object),
+            items_df['Maddənin Adı'].to_numpy(dtype=object),
+            amounts,
+        )
+        return True, ""
+
+    def update_item(self, idx, number, name, amount, total_budget=None):
+        """Maddəni yenilə - büdcə aşılarsa dəyişiklik ləğv edilir"""
+        total_qepik = self.total_qepik if total_budget is None else to_qepik(total_budget)
+        amount = to_qepik(amount)
+        new_used = self.used_qepik - int(self.amounts[idx]) + amount
+        is_valid, error_msg = _check_total(new_used, total_qepik)
+        if not is_valid:
+            return False, error_msg
+
+        self.apply_change('update', idx, number, name, amount)
+        return True, ""
+
+    def delete_item(self, idx):
+        """Maddəni sil"""
+        self.apply_change('delete', idx)
+
+    def apply_edits(self, updates, deletions=(), total_budget=None):
+        """Redaktə və silmələri birlikdə tətbiq et - büdcə aşılarsa heç biri tətbiq edilmir
+
+        `updates` {indeks: (nömrə, ad, məbləğ)}, `deletions` isə silinəcək indekslərdir.
+        """
+        total_qepik = self.total_qepik if total_budget is None else to_qepik(total_budget)
+        deletions = sorted(set(deletions), reverse=True)
+        updates = {
+            idx: (number, name, to_qepik(amount))
+            for idx, (number, name, amount) in updates.items() if idx not in deletions
+        }
+
+        new_used = self.used_qepik
+        for idx, (_, _, amount) in updates.items():
+            new_used += amount - int(self.amounts[idx])
+        for idx in deletions:
+            new_used -= int(self.amounts[idx])
+        if len(self) > len(deletions):
+            is_valid, error_msg = _check_total(new_used, total_qepik)
+            if not is_valid:
+                return False, error_msg
+
+        with self.batch():
+            for idx, (number, name, amount) in updates.items():
+                self.apply_change('update', idx, number, name, amount)
+            for idx in deletions:
+                self.apply_change('delete', idx)
+        return True, ""
+
+    def apply_amounts(self, indices, amounts, total_qepik=None):
+        """Maddələrin məbləğlərini (qəpik) və ümumi büdcəni birlikdə dəyiş
+
+        Büdcə aşılarsa heç biri tətbiq edilmir.
+        """
+        total_qepik = self.total_qepik if total_qepik is None else int(total_qepik)
+        indices = np.asarray(indices, dtype=np.int64)
+        amounts = np.asarray(amounts, dtype=np.int64)
+        new_used = self.used_qepik + int(amounts.sum()) - int(self.amounts[indices].sum())
+        is_valid, error_msg = _check_total(new_used, total_qepik)
+        if not is_valid:
+            return False, error_msg
+
+        with self.batch():
+            if total_qepik != self.total_qepik:
+                self.apply_change('set_budget', total_qepik)
+            if len(indices):
+                self.apply_change('set_amounts', indices, amounts)
+        return True, ""
+
+    @contextmanager
+    def batch(self):
+        """Bir neçə dəyişikliyi bir əməliyyat kimi qruplaşdır (sonda 'commit' bildirilir)"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._notify('commit')
+
+    @property
+    def in_batch(self):
+        return self._batch_depth > 0
+
+    def apply_change(self, op, *args):
+        """Dəyişikliyi doğrulamadan tətbiq et və dinləyicilərə bildir
+
+        Bütün dəyişikliklər buradan keçir (jurnal da geri alma üçün bunu çağırır):
+            ('set_budget', ümumi qəpik)
+            ('add', nömrələr, adlar, qəpiklər)      - sona əlavə
+            ('insert', indeks, nömrə, ad, qəpik)
+            ('update', indeks, nömrə, ad, qəpik)
+            ('delete', indeks)
+            ('truncate', indeks)                    - indeksdən sona qədər sil
+            ('set_amounts', indekslər, qəpiklər)    - bir neçə maddənin məbləği
+        Bildirişlərə geri alma üçün köhnə dəyərlər də əlavə olunur.
+        """
+        if op == 'set_budget':
+            old_total = self.total_qepik
+            self.total_qepik = int(args[0])
+            self._notify('set_budget', self.total_qepik, old_total)
+        elif op == 'add':
+            numbers, names, amounts = args
+            amounts = np.asarray(amounts, dtype=np.int64)
+            start = len(self)
+            self.items.extend(numbers, names, amounts)
+            self.used_qepik += int(amounts.sum())
+            self._notify('add', start, self.numbers[start:], self.names[start:], self.amounts[start:])
+        elif op == 'insert':
+            idx, number, name, amount = args
+            self.items.insert(idx, number, name, int(amount))
+            self.used_qepik += int(amount)
+            self._notify('insert', idx, number, name, int(amount))
+        elif op == 'update':
+            idx, number, name, amount = args
+            old_number, old_name, old_amount = self.items.get(idx)
+            self.items.set(idx, number, name, int(amount))
+            self.used_qepik += int(amount) - old_amount
+            self._notify('update', idx, number, name, int(amount), old_number, old_name, old_amount)
+        elif op == 'delete':
+            (idx,) = args
+            old_number, old_name, old_amount = self.items.get(idx)
+            self.items.delete(idx)
+            self.used_qepik -= old_amount
+            self._notify('delete', idx, old_number, old_name, old_amount)
+        elif op == 'truncate':
+            (start,) = args
+            removed = (self.numbers[start:].copy(), self.names[start:].copy(), self.amounts[start:].copy())
+            self.items.truncate(start)
+            self.used_qepik -= int(removed[2].sum())
+            self._notify('truncate', start, *removed)
+        elif op == 'set_amounts':
+            indices = np.asarray(args[0], dtype=np.int64)
+            amounts = np.asarray(args[1], dtype=np.int64)
+            old_amounts = self.amounts[indices].copy()
+            self.amounts[indices] = amounts
+            self.used_qepik += int(amounts.sum()) - int(old_amounts.sum())
+            self._notify('set_amounts', indices, amounts, old_amounts)
+        else:
+            raise ValueError(f"Naməlum əməliyyat: {op}")
+
+    def find_items(self, query):
+        """Nömrə və ya ada görə axtarış - uyğun maddələrin indekslərini qaytar"""
+        if not query:
+            return np.arange(len(self))
+        numbers = pd.Series(self.numbers, dtype=object).astype(str)
+        names = pd.Series(self.names, dtype=object).astype(str)
+        mask = (numbers.str.contains(query, case=False, regex=False)
+                | names.str.contains(query, case=False, regex=False))
+        return np.flatnonzero(mask.to_numpy())
+
+    def to_frame(self, indices=None):
+        """Maddələri DataFrame kimi qaytar (Məbləğ AZN, Faiz rəqəm kimi)
+
+        `indices` verilərsə yalnız həmin maddələr (öz indeksləri ilə) qaytarılır.
+        """
+        if indices is None:
+            return pd.DataFrame({
+                'Maddə Nömrəsi': self.numbers,
+                'Maddənin Adı': self.names,
+                'Məbləğ': to_azn(self.amounts),
+                'Faiz': self.percentages(),
+            }, columns=COLUMNS)
+        indices = np.asarray(indices, dtype=np.intp)
+        return pd.DataFrame({
+            'Maddə Nömrəsi': self.numbers[indices],
+            'Maddənin Adı': self.names[indices],
+            'Məbləğ': to_azn(self.amounts[indices]),
+            'Faiz': self.percentages()[indices],
+        }, columns=COLUMNS, index=indices)
+
+    def display_frame(self, indices=None):
+        """Göstərmək üçün cədvəl - Faiz yalnız burada sətrə çevrilir"""
+        items_df = self.to_frame(indices)
+        items_df['Faiz'] = [format_percentage(p) for p in items_df['Faiz'].tolist()]
+        return items_df
+
+    @classmethod
+    def from_frame(cls, name, items_df, total_budget):
+        """DataFrame-dən rayon büdcəsi yarat (Məbləğ AZN ilə)"""
+        region = cls(name, total_budget)
+        region.items = ItemBuffer.from_arrays(
+            items_df['Maddə Nömrəsi'].to_numpy(dtype=object),
+            items_df['Maddənin Adı'].to_numpy(dtype=object),
+            to_qepik_array(pd.to_numeric(items_df['Məbləğ'])),
+        )
+        region._refresh_totals()
+        return region
+
+    @classmethod
+    def from_buffer(cls, name, total_qepik, buffer):
+        """Hazır ItemBuffer-dən rayon büdcəsi yarat (məbləğlər qəpiklə)"""
+        region = cls(name)
+        region.total_qepik = int(total_qepik)
+        region.items = buffer
+        region._refresh_totals()
+        return region
+
+
+class ConflictError(Exception):
+    """Rayon bu sessiya yüklədikdən sonra başqa sessiya tərəfindən dəyişdirilib"""
+
+    def __init__(self, name):
+        super().__init__(
+            f"Xəta: {name} rayonu başqa istifadəçi tərəfindən dəyişdirilib! "
+            "Ən son məlumatlar yükləndi - dəyişikliyi yenidən tətbiq edin."
+        )
+        self.name = name
+
+
+class BudgetBook:
+    """Bütün rayonların büdcələri
+
+    `store` verilərsə rayonlar yalnız müraciət edildikdə yüklənir və hər dəyişiklik
+    dərhal saxlama qatına yazılır. Saxlama qatı bir neçə sessiya arasında ortaq ola
+    bilər: hər yüklənmiş rayonun revision-u yadda saxlanılır, `edit()` yazmadan əvvəl
+    onu yoxlayır (optimistik kilid), `refresh()` isə başqa sessiyaların dəyişdirdiyi
+    rayonları keşdən atır.
+    """
+
+    def __init__(self, store=None):
+        self.regions = {}
+        self.store = store
+        self.aggregates = BookAggregates()
+        # Maddə nömrəsi və adına görə indeks (ilk axtarışda qurulur); saxlama qatı
+        # varsa onun bütün sessiyalar üçün ortaq indeksidir və onunla yenilənir
+        self.index = store.index if store is not None else BookIndex()
+        # Hər yüklənmiş rayonun dəyişiklik jurnalı (geri al / təkrarla)
+        self.journals = {}
+        # Yüklənmiş rayonların saxlama qatındakı revision-u və son görülən vəziyyət
+        self.revisions = {}
+        self.seen_revision = None
+        self._known_revisions = {}
+        if store is not None:
+            self.seen_revision = store.revision()
+            self._known_revisions = store.region_revisions()
+            self.aggregates.seed(store.region_stats())
+
+    def _attach(self, region):
+        if self.store is not None and self.store not in region.listeners:
+            region.listeners.append(self.store)
+            region.listeners.append(self._track_revision)
+        if self.aggregates not in region.listeners:
+            region.listeners.append(self.aggregates)
+        if self.store is None and self.index not in region.listeners:
+            region.listeners.append(self.index)
+        journal = self.journals.get(region.name)
+        if journal is None or journal.region is not region:
+            journal = RegionJournal(region)
+            self.journals[region.name] = journal
+            region.listeners.append(journal)
+        self.aggregates.track(region)
+
+    def _track_revision(self, region, op, *args):
+        """Bu sessiyanın öz yazısından sonra rayonun yeni revision-unu yadda saxla"""
+        if op == 'commit' or not region.in_batch:
+            self.revisions[region.name] = self.store.region_revision(region.name)
+
+    def _load(self, name):
+        """Rayonu saxlama qatından yüklə"""
+        if self.store is None:
+            raise KeyError(name)
+        with self.store.region_lock(name):
+            revision = self.store.region_revision(name)
+            loaded = self.store.load_region(name)
+        if loaded is None:
+            raise KeyError(name)
+        region = RegionBudget.from_buffer(name, *loaded)
+        self._attach(region)
+        self.regions[name] = region
+        self.revisions[name] = revision
+        return region
+
+    def _forget(self, name):
+        """Rayonu keşdən at - növbəti müraciətdə saxlama qatından yenidən yüklənir"""
+        self.regions.pop(name, None)
+        self.journals.pop(name, None)
+        self.revisions.pop(name, None)
+
+    def __contains__(self, name):
+        if name in self.regions:
+            return True
+        return self.store is not None and self.store.has_region(name)
+
+    def __getitem__(self, name):
+        if name in self.regions:
+            return self.regions[name]
+        return self._load(name)
+
+    def __setitem__(self, name, region):
+        self.update({name: region})
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self._forget(name)
+        self.aggregates.drop(name)
+        if self.store is not None:
+            self.store.delete_region(name)
+        else:
+            self.index.drop_region(name)
+            self._known_revisions.pop(name, None)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def keys(self):
+        if self.store is not None:
+            return self.store.region_names()
+        return list(self.regions)
+
+    def values(self):
+        return [self[name] for name in self.keys()]
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
+
+    def update(self, regions):
+        """Rayonları əlavə et və ya əvəz et (saxlama qatına bir tranzaksiyada)"""
+        for name, region in regions.items():
+            region.name = name
+            self._attach(region)
+            self.regions[name] = region
+            if self.store is None and self.index.built:
+                self.index.index_region(region)
+        if self.store is not None and regions:
+            with ExitStack() as stack:
+                for name in sorted(regions):
+                    stack.enter_context(self.store.region_lock(name))
+                self.store.save_regions(list(regions.values()))
+                for name in regions:
+                    self.revisions[name] = self.store.region_revision(name)
+
+    @contextmanager
+    def edit(self, name):
+        """Rayonu kilidləyib redaktə üçün ver
+
+        Rayon bu sessiya yüklədikdən sonra başqa sessiya tərəfindən dəyişdirilibsə
+        keşdən atılır və ConflictError qaldırılır. Kilid rayon üzrədir - başqa
+        rayonların redaktəsini gözlətmir.
+        """
+        if self.store is None:
+            yield self[name]
+            return
+        with self.store.region_lock(name):
+            if name in self.regions and self.store.region_revision(name) != self.revisions.get(name):
+                self._forget(name)
+                if not self.store.has_region(name):
+                    # Rayon başqa sessiyada silinib
+                    self.aggregates.drop(name)
+                raise ConflictError(name)
+            yield self[name]
+
+    def edit_region(self, name, change):
+        """`change(region)`-u kilid altında tətbiq et - (uğur, xəta mesajı) qaytarır"""
+        try:
+            with self.edit(name) as region:
+                result = change(region)
+        except ConflictError as exc:
+            return False, str(exc)
+        return (True, "") if result is None else result
+
+    def refresh(self):
+        """Başqa sessiyaların dəyişdirdiyi rayonları keşdən at və cəmləri yenilə
+
+        Yalnız dəyişmiş rayonlar yenidən yüklənir. Dəyişmiş rayonların adlarını qaytarır.
+        """
+        if self.store is None:
+            return []
+        revision = self.store.revision()
+        if revision == self.seen_revision:
+            return []
+        self.seen_revision = revision
+
+        current = self.store.region_revisions()
+        previous, self._known_revisions = self._known_revisions, current
+        changed = [
+            name for name, rev in current.items()
+            if rev != self.revisions.get(name, previous.get(name))
+        ]
+        removed = [name for name in set(previous) | set(self.revisions) if name not in current]
+
+        for name in changed + removed:
+            self._forget(name)
+        for name in removed:
+            self.aggregates.drop(name)
+        if changed:
+            self.aggregates.seed(self.store.region_stats(changed))
+        return sorted(changed + removed)
+
+    def item_index(self):
+        """Maddə indeksi - ilk müraciətdə bütün rayonlardan qurulur, sonra dəyişikliklərlə yenilənir"""
+        if self.store is not None:
+            return self.store.item_index()
+        if not self.index.built:
+            self.index.build(
+                (region.name, number, item_name, amount)
+                for region in self.regions.values()
+                for number, item_name, amount in zip(region.numbers, region.names, region.amounts.tolist())
+            )
+        return self.index
+
+    def search(self, query, limit=200):
+        """Bütün rayonlarda maddə nömrəsi və ya adına görə axtarış (DataFrame)"""
+        return search_frame(self, query, limit)
+
+    def duplicates(self, name, number):
+        """Nömrənin təkrarları: (bu rayondakı sayı, {digər rayon: sayı})"""
+        occurrences = self.item_index().occurrences(number)
+        count = occurrences.pop(name, 0)
+        return count, occurrences
+
+    def rollup(self, min_regions=1):
+        """Maddə nömrəsi üzrə bütün rayonların cəmi (DataFrame)"""
+        return rollup_frame(self.item_index(), min_regions)
+
+    def journal(self, name):
+        """Rayonun dəyişiklik jurnalı (rayon lazım olduqda yüklənir)"""
+        self[name]
+        return self.journals[name]
+
+    def top_items(self, n=10):
+        """Bütün rayonlar üzrə ən böyük `n` maddə (DataFrame)"""
+        if self.store is not None:
+            rows = self.store.top_items(n)
+        else:
+            rows = [row for region in self.regions.values()
+                    for row in self.aggregates.region_top_items(region, n)]
+        return top_items_frame(rows, n)
+
+    def get_or_create(self, name, total_budget=0.0):
+        """Rayonu qaytar, yoxdursa yarat"""
+        if name not in self:
+            self[name] = RegionBudget(name, total_budget)
+        return self[name]
+
+    def has_items(self):
+        """Hər hansı rayonda maddə varmı"""
+        if self.store is not None:
+            return self.store.has_items()
+        return any(not region.empty for region in self.regions.values())
+
+    def validate_all(self):
+        """Bütün rayonları doğrula - {rayon: xəta mesajı} qaytarır"""
+        errors = {}
+        for name, region in self.items():
+            is_valid, error_msg = region.validate()
+            if not is_valid:
+                errors[name] = error_msg
+        return errors
@@ -0,0 +1,481 @@
+"""Excel ixracı və idxalı"""
+import io
+import math
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+import zlib
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pandas as pd
+
+from .engine import COLUMNS, REQUIRED_COLUMNS, RegionBudget, format_percentage
+from .money import to_azn
+from .rules import CONFLICT_RULES
+
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# İxrac edilən vərəqin xülasə sətrlərinin etiketləri
+SUMMARY_LABELS = ['XÜLASƏ', 'Ümumi Büdcə', 'İstifadə Edilən', 'Qalan Büdcə']
+
+# Toplu idxalda hər faylın nəticəsi
+FileImportResult = namedtuple('FileImportResult', ['name', 'regions', 'warnings', 'seconds', 'error'])
+
+# Xülasə sətri olmayan fayllar üçün ehtiyat (maddələrin cəminə 10% əlavə)
+BUDGET_RESERVE = 1.1
+
+# Paketin sıxılma səviyyəsi - XML yaxşı sıxılır, aşağı səviyyə ixracı xeyli sürətləndirir
+_COMPRESS_LEVEL = 1
+
+# Bir ixracçının keşlədiyi vərəqlərin (sıxılmış) ölçü limiti
+SHEET_CACHE_BYTES = 16 * 1024 * 1024
+
+# Excel vərəq adında qəbul etmədiyi simvollar
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def sheet_name(region_name):
+    """Excel vərəq adı (qadağan simvollar '_' ilə əvəz olunur, 31 simvol limiti)"""
+    return _INVALID_SHEET_CHARS.sub("_", region_name)[:30].strip("'") or "Sheet"
+
+
+def unique_sheet_names(region_names):
+    """Rayonların vərəq adları - kəsildikdən sonra üst-üstə düşənlərə nömrə əlavə olunur
+
+    Excel vərəq adlarını böyük/kiçik hərfə həssas olmadan müqayisə edir.
+    """
+    used = set()
+    titles = []
+    for region_name in region_names:
+        base = title = sheet_name(region_name)
+        counter = 1
+        while title.lower() in used:
+            counter += 1
+            suffix = f" ({counter})"
+            title = base[:30 - len(suffix)] + suffix
+        used.add(title.lower())
+        titles.append(title)
+    return titles
+
+
+def region_sheet_rows(region):
+    """Rayon vərəqinin sətrləri: başlıq, maddələr və xülasə"""
+    rows = [tuple(COLUMNS)]
+    percentages = region.percentages().tolist()
+    rows.extend(zip(
+        region.numbers.tolist(),
+        region.names.tolist(),
+        to_azn(region.amounts).tolist(),
+        [format_percentage(p) for p in percentages],
+    ))
+    # Xülasə məlumatları
+    rows.extend([
+        (None, None, None, None),
+        ('XÜLASƏ', None, None, None),
+        ('Ümumi Büdcə', None, region.total_budget, '100%'),
+        ('İstifadə Edilən', None, region.used_amount, format_percentage(region.used_percentage)),
+        ('Qalan Büdcə', None, region.remaining_budget, format_percentage(region.remaining_percentage)),
+    ])
+    return rows
+
+
+# Minimal SpreadsheetML paketi - vərəqlər openpyxl-siz, birbaşa XML kimi yazılır
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_SHEET_START = (_XML_DECLARATION + f'<worksheet xmlns="{_MAIN_NS}">').encode("utf-8")
+_SHEET_END = b'</sheetData></worksheet>'
+_STYLES = (
+    _XML_DECLARATION + f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+# XML-də icazə verilməyən idarəetmə simvolları
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(reference, value):
+    if value is None:
+        return ""
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_)):
+        if isinstance(value, (float, np.floating)):
+            value = float(value)
+            if not math.isfinite(value):
+                return ""
+            return f'<c r="{reference}"><v>{value!r}</v></c>'
+        return f'<c r="{reference}"><v>{int(value)}</v></c>'
+    text = escape(_ILLEGAL_XML.sub("", str(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def sheet_xml(rows):
+    """Vərəq sətrlərindən worksheet XML-i (mətnlər sətrdaxili - ortaq cədvəl lazım deyil)"""
+    parts = []
+    letters = []
+    row_number = 0
+    for row_number, row in enumerate(rows, start=1):
+        while len(letters) < len(row):
+            letters.append(_column_letter(len(letters)))
+        cells = "".join(_cell_xml(f"{letters[i]}{row_number}", value) for i, value in enumerate(row))
+        parts.append(f'<row r="{row_number}">{cells}</row>'.encode("utf-8"))
+    # Oxuyucular (məs. openpyxl read_only) vərəqin ölçüsünü buradan götürür
+    dimension = f"A1:{letters[-1]}{row_number}" if letters else "A1"
+    start = _SHEET_START + f'<dimension ref="{dimension}"/><sheetData>'.encode("utf-8")
+    return b"".join([start, *parts, _SHEET_END])
+
+
+def assemble_workbook(sheets):
+    """Hazır worksheet XML-lərindən .xlsx paketi qur
+
+    `sheets` (vərəq adı, worksheet XML) cütlərindən ibarətdir.
+    """
+    sheets = list(sheets) or [("Sheet1", sheet_xml([]))]
+    content_types = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, len(sheets) + 1)
+    )
+    sheet_entries = "".join(
+        f'<sheet name={quoteattr(title)} sheetId="{i}" r:id="rId{i}"/>'
+        for i, (title, _) in enumerate(sheets, start=1)
+    )
+    sheet_relations = "".join(
+        f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, len(sheets) + 1)
+    )
+    parts = {
+        "[Content_Types].xml": (
+            _XML_DECLARATION
+            + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + content_types + '</Types>'
+        ),
+        "_rels/.rels": (
+            _XML_DECLARATION + f'<Relationships xmlns="{_PACKAGE_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        "xl/workbook.xml": (
+            _XML_DECLARATION + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            f'<sheets>{sheet_entries}</sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            _XML_DECLARATION + f'<Relationships xmlns="{_PACKAGE_REL_NS}">' + sheet_relations
+            + f'<Relationship Id="rId{len(sheets) + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ),
+        "xl/styles.xml": _STYLES,
+    }
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED, compresslevel=_COMPRESS_LEVEL) as package:
+        for name, text in parts.items():
+            package.writestr(name, text.encode("utf-8"))
+        for i, (_, xml) in enumerate(sheets, start=1):
+            package.writestr(f"xl/worksheets/sheet{i}.xml", xml)
+    return output.getvalue()
+
+
+class WorkbookExporter:
+    """Excel ixracı - yalnız dəyişmiş rayonların vərəqləri yenidən hazırlanır
+
+    Vərəqlər openpyxl-siz, birbaşa XML kimi yazılır: openpyxl hər ixracda bütün
+    vərəqləri yenidən yazırdı və bu ixracın demək olar bütün vaxtı idi. Hər rayonun
+    worksheet XML-i rayonun versiyasına görə sıxılmış şəkildə keşlənir; keşin ölçüsü
+    `max_cache_bytes` ilə məhduddur (ən çoxdan istifadə edilməyən vərəqlər atılır).
+    """
+
+    def __init__(self, max_cache_bytes=SHEET_CACHE_BYTES):
+        self.max_cache_bytes = max_cache_bytes
+        # rayon -> (versiya, zlib ilə sıxılmış XML)
+        self._sheets = OrderedDict()
+        self._cache_bytes = 0
+        self._workbook_key = None
+        self._workbook = None
+
+    @property
+    def workbook(self):
+        """Son hazırlanmış fayl (hələ hazırlanmayıbsa None)"""
+        return self._workbook
+
+    def sheet(self, region):
+        """Rayon vərəqinin XML-i (rayon versiyasına görə keşlənir)"""
+        cached = self._sheets.get(region.name)
+        if cached is not None and cached[0] == region.version:
+            self._sheets.move_to_end(region.name)
+            return zlib.decompress(cached[1])
+        xml = sheet_xml(region_sheet_rows(region))
+        self._forget(region.name)
+        compressed = zlib.compress(xml, _COMPRESS_LEVEL)
+        self._sheets[region.name] = (region.version, compressed)
+        self._cache_bytes += len(compressed)
+        while self._cache_bytes > self.max_cache_bytes and self._sheets:
+            self._forget(next(iter(self._sheets)))
+        return xml
+
+    def _forget(self, name):
+        cached = self._sheets.pop(name, None)
+        if cached is not None:
+            self._cache_bytes -= len(cached[1])
+
+    def is_current(self, book):
+        """Son hazırlanmış fayl kitabın cari vəziyyətinə uyğundurmu (rayonlar yüklənmir)"""
+        return self._workbook is not None and self._workbook_key == _book_key(book)
+
+    def export(self, book):
+        """Bütün rayonları .xlsx kimi qaytar - heç nə dəyişməyibsə keşdən"""
+        key = _book_key(book)
+        if key != self._workbook_key:
+            regions = [book[name] for name, _ in key]
+            for name in set(self._sheets) - {region.name for region in regions}:
+                self._forget(name)
+            titles = unique_sheet_names(region.name for region in regions)
+            self._workbook = assemble_workbook(
+                (title, self.sheet(region)) for title, region in zip(titles, regions)
+            )
+            self._workbook_key = key
+        return self._workbook
+
+
+def _book_key(book):
+    """Kitabın məzmun açarı: boş olmayan rayonlar və onların versiyası/revision-u
+
+    Saxlama qatı varsa revision-lar bir sorğu ilə oxunur - rayonlar yüklənmir.
+    """
+    stats = book.aggregates.stats
+    if book.store is not None:
+        versions = book.store.region_revisions()
+    else:
+        versions = {name: region.version for name, region in book.regions.items()}
+    return tuple(
+        (name, versions.get(name)) for name in book.keys() if name in stats and stats[name][2] > 0
+    )
+
+
+def sheet_names(source):
+    """Vərəq adlarını vərəqləri oxumadan qaytar"""
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(_rewind(source), read_only=True)
+    except Exception:
+        return pd.ExcelFile(_rewind(source)).sheet_names
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def read_workbook(source):
+    """Bütün vərəqləri bir keçiddə oxu - {vərəq adı: DataFrame} qaytarır"""
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(_rewind(source), read_only=True, data_only=True)
+    except Exception:
+        # .xls və s. - pandas-ın öz oxuyucusu ilə, yenə də bir dəfə
+        return pd.read_excel(_rewind(source), sheet_name=None)
+
+    sheets = {}
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                sheets[worksheet.title] = pd.DataFrame()
+                continue
+            sheets[worksheet.title] = pd.DataFrame(list(rows), columns=list(header))
+    finally:
+        workbook.close()
+    return sheets
+
+
+def parse_region_sheet(region_name, df):
+    """Vərəqdən rayon büdcəsi yarat - uyğun maddə yoxdursa None
+
+    Ümumi büdcə ixrac zamanı yazılan 'Ümumi Büdcə' sətrindən götürülür.
+    """
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        return None
+
+    numbers = df['Maddə Nömrəsi']
+    names = df['Maddənin Adı']
+    amounts = pd.to_numeric(df['Məbləğ'], errors='coerce')
+
+    # XÜLASƏ sətrlərini çıxar
+    is_summary = numbers.isin(SUMMARY_LABELS)
+    is_item = (~is_summary & numbers.notna() & (numbers != '')
+               & ~names.isin(['', 'XÜLASƏ']) & amounts.notna())
+    if not is_item.any():
+        return None
+
+    items_df = pd.DataFrame({
+        'Maddə Nömrəsi': numbers[is_item],
+        'Maddənin Adı': names[is_item],
+        'Məbləğ': amounts[is_item],
+    })
+
+    budget_rows = amounts[(numbers == 'Ümumi Büdcə') & amounts.notna()]
+    if len(budget_rows):
+        total_budget = float(budget_rows.iloc[0])
+    else:
+        total_budget = float(items_df['Məbləğ'].sum()) * BUDGET_RESERVE
+    return RegionBudget.from_frame(region_name, items_df, total_budget)
+
+
+def import_workbook(source, progress=None):
+    """Excel faylından bütün rayonları oxu
+
+    ({rayon: RegionBudget}, [(vərəq, xəta mesajı)]) qaytarır. `progress` verilərsə
+    hər vərəqdən sonra progress(hazır, cəmi, vərəq adı) çağırılır.
+    """
+    sheets = read_workbook(source)
+    regions = {}
+    warnings = []
+    for done, (name, df) in enumerate(sheets.items(), start=1):
+        try:
+            region = parse_region_sheet(name, df)
+            if region is not None:
+                regions[name] = region
+        except Exception as e:
+            warnings.append((name, str(e)))
+        if progress is not None:
+            progress(done, len(sheets), name)
+    return regions, warnings
+
+
+def _import_file(name, data):
+    """Bir faylı idxal et (prosesdə icra olunur)"""
+    start = time.perf_counter()
+    try:
+        source = io.BytesIO(data) if isinstance(data, bytes) else data
+        regions, warnings = import_workbook(source)
+        error = None
+    except Exception as e:
+        regions, warnings, error = {}, [], str(e)
+    return name, regions, warnings, time.perf_counter() - start, error
+
+
+def _merge_regions(existing, incoming):
+    """İki rayonun maddələrini birləşdir, büdcələri topla"""
+    items_df = pd.concat([existing.to_frame(), incoming.to_frame()], ignore_index=True)
+    return RegionBudget.from_frame(
+        existing.name, items_df, existing.total_budget + incoming.total_budget
+    )
+
+
+def import_files(sources, book=None, conflict='replace', max_workers=None):
+    """Bir neçə Excel faylını paralel (proses hovuzunda) idxal et
+
+    `sources` (ad, bytes və ya fayl yolu) cütləridir. Nəticələr faylların verilmə
+    sırası ilə `conflict` qaydasına görə birləşdirilir və `book` verilərsə ona bir
+    tranzaksiyada yazılır. ({rayon: RegionBudget}, [FileImportResult]) qaytarır.
+    """
+    if conflict not in CONFLICT_RULES:
+        raise ValueError(f"Naməlum qayda: {conflict}")
+    sources = list(sources)
+    if max_workers is None:
+        max_workers = min(len(sources), os.cpu_count() or 1)
+
+    if max_workers <= 1:
+        outcomes = [_import_file(name, data) for name, data in sources]
+    else:
+        # spawn: Streamlit serveri çoxaxınlıdır - fork açıq SQLite bağlantısını və
+        # tutulmuş kilidləri uşaq prosesə köçürüb onu kilidləyə bilər
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            outcomes = list(executor.map(
+                _import_file, [name for name, _ in sources], [data for _, data in sources]
+            ))
+
+    merged = {}
+    results = []
+    for name, regions, warnings, seconds, error in outcomes:
+        for region_name, region in regions.items():
+            if region_name in merged:
+                existing = merged[region_name]
+            elif book is not None and region_name in book:
+                existing = book[region_name]
+            else:
+                existing = None
+
+            if existing is None or conflict == 'replace':
+                merged[region_name] = region
+            elif conflict == 'merge':
+                merged[region_name] = _merge_regions(existing, region)
+            elif region_name in merged:
+                # keep: eyni partiyadakı əvvəlki fayl saxlanılır
+                continue
+        results.append(FileImportResult(name, list(regions), warnings, seconds, error))
+
+    if book is not None and conflict == 'keep':
+        merged = {name: region for name, region in merged.items() if name not in book}
+    if book is not None and merged:
+        book.update(merged)
+    return merged, results
+
+
+class ImportJob:
+    """Excel idxalını arxa plan axınında icra et"""
+
+    def __init__(self, data):
+        self.data = data
+        self.progress = 0.0
+        self.current_sheet = ""
+        self.regions = {}
+        self.warnings = []
+        self.error = None
+        self._started = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def done(self):
+        return self._started and not self._thread.is_alive()
+
+    def start(self):
+        self._started = True
+        self._thread.start()
+        return self
+
+    def _report(self, done, total, name):
+        self.progress = done / total
+        self.current_sheet = name
+
+    def _run(self):
+        try:
+            self.regions, self.warnings = import_workbook(io.BytesIO(self.data), self._report)
+        except Exception as e:
+            self.error = str(e)
+        self.progress = 1.0
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source
@@ -0,0 +1,274 @@
+"""Maddələrin yaddaşdaxili indeksi - rayonlar üzrə axtarış, təkrar nömrələr və cəmlər
+
+İndeks maddə nömrəsinə görə heş cədvəli və maddə adının normallaşdırılmış
+sözlərinə görə tərs indeksdən ibarətdir. Hər ikisi RegionBudget dinləyicisi kimi
+hər dəyişiklikdə yalnız dəyişən maddələr üçün yenilənir (saxlama qatı varsa indeks
+onundur və bütün sessiyalar üçün ortaqdır). Postinqlər maddənin
+mövqeyini deyil, rayon üzrə sayı saxlayır - silmə və əlavələrdə mövqelərin
+sürüşməsi indeksə təsir etmir. Axtarışda yalnız uyğun rayonlar vektorlaşdırılmış
+şəkildə yoxlanılır.
+"""
+import bisect
+import itertools
+import re
+import threading
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from .money import to_azn
+
+# Azərbaycan hərfləri: böyük İ/I düzgün kiçildilir, sonra diakritikalar sadələşdirilir
+# ki, "seher" sorğusu "Şəhər"-i tapsın
+_UPPER = str.maketrans({'İ': 'i', 'I': 'ı'})
+_FOLD = str.maketrans({
+    'ə': 'e', 'ı': 'i', 'ö': 'o', 'ü': 'u', 'ş': 's', 'ç': 'c', 'ğ': 'g', '\u0307': None,
+})
+_TOKEN = re.compile(r"\w+")
+
+SEARCH_COLUMNS = ['Rayon', 'İndeks', 'Maddə Nömrəsi', 'Maddənin Adı', 'Məbləğ']
+ROLLUP_COLUMNS = ['Maddə Nömrəsi', 'Rayon Sayı', 'Maddə Sayı', 'Məbləğ']
+
+
+def normalize(text):
+    """Axtarış üçün mətn: kiçik hərf, Azərbaycan hərfləri sadələşdirilmiş"""
+    if text is None:
+        return ""
+    return str(text).translate(_UPPER).lower().translate(_FOLD)
+
+
+def normalize_number(number):
+    """Maddə nömrəsinin açarı (boşluqlar nəzərə alınmır)"""
+    return "".join(normalize(number).split())
+
+
+def tokenize(text):
+    return _TOKEN.findall(normalize(text))
+
+
+class BookIndex:
+    """Bütün rayonların maddə indeksi
+
+    `numbers`: nömrə açarı -> {rayon: [maddə sayı, məbləğ cəmi (qəpik)]}
+    `tokens`:  söz -> {rayon: maddə sayı}
+
+    İndeks sessiyalar arasında ortaq ola bilər - bütün oxu və yazılar `lock` altındadır.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.numbers = {}
+        self.tokens = {}
+        self.labels = {}
+        self.built = False
+        # Rayonun indeksdəki açarları (rayonu tez silmək üçün)
+        self._region_numbers = {}
+        self._region_tokens = {}
+        self._vocabulary = None
+        # rayon -> (versiya, normallaşdırılmış nömrələr, normallaşdırılmış adlar)
+        self._normalized = {}
+
+    def __call__(self, region, op, *args):
+        with self.lock:
+            if self.built:
+                self._apply(region, op, args)
+
+    def _apply(self, region, op, args):
+        name = region.name
+        if op in ('add', 'truncate'):
+            for number, item_name, amount in zip(args[1], args[2], args[3].tolist()):
+                if op == 'add':
+                    self._add(name, number, item_name, amount)
+                else:
+                    self._remove(name, number, item_name, amount)
+        elif op == 'insert':
+            self._add(name, *args[1:4])
+        elif op == 'update':
+            self._remove(name, *args[4:7])
+            self._add(name, *args[1:4])
+        elif op == 'delete':
+            self._remove(name, *args[1:4])
+        elif op == 'set_amounts':
+            indices, amounts, old_amounts = args
+            for number, delta in zip(region.numbers[indices], (amounts - old_amounts).tolist()):
+                self.numbers[normalize_number(number)][name][1] += delta
+
+    def _add(self, region_name, number, item_name, amount):
+        key = normalize_number(number)
+        self.labels.setdefault(key, "" if number is None else str(number))
+        posting = self.numbers.setdefault(key, {}).setdefault(region_name, [0, 0])
+        posting[0] += 1
+        posting[1] += int(amount)
+        self._region_numbers.setdefault(region_name, set()).add(key)
+
+        for token in set(tokenize(item_name)):
+            postings = self.tokens.get(token)
+            if postings is None:
+                postings = self.tokens[token] = {}
+                self._vocabulary = None
+            postings[region_name] = postings.get(region_name, 0) + 1
+            self._region_tokens.setdefault(region_name, set()).add(token)
+
+    def _remove(self, region_name, number, item_name, amount):
+        key = normalize_number(number)
+        postings = self.numbers.get(key, {})
+        posting = postings.get(region_name)
+        if posting is not None:
+            posting[0] -= 1
+            posting[1] -= int(amount)
+            if posting[0] <= 0:
+                del postings[region_name]
+                self._region_numbers[region_name].discard(key)
+            if not postings:
+                self.numbers.pop(key, None)
+                self.labels.pop(key, None)
+
+        for token in set(tokenize(item_name)):
+            postings = self.tokens.get(token, {})
+            if region_name not in postings:
+                continue
+            postings[region_name] -= 1
+            if postings[region_name] <= 0:
+                del postings[region_name]
+                self._region_tokens[region_name].discard(token)
+            if not postings:
+                del self.tokens[token]
+                self._vocabulary = None
+
+    def build(self, rows):
+        """İndeksi (rayon, nömrə, ad, məbləğ) sətrlərindən qur (sətrlər rayona görə ardıcıl)"""
+        with self.lock:
+            for region_name, group in itertools.groupby(rows, key=itemgetter(0)):
+                for _, number, item_name, amount in group:
+                    self._add(region_name, number, item_name, amount)
+            self.built = True
+
+    def index_region(self, region):
+        """Rayonu indeksə əlavə et (əvvəlki məlumatı silərək)"""
+        with self.lock:
+            self.drop_region(region.name)
+            for number, item_name, amount in zip(region.numbers, region.names, region.amounts.tolist()):
+                self._add(region.name, number, item_name, amount)
+
+    def drop_region(self, region_name):
+        """Rayonun bütün maddələrini indeksdən sil"""
+        with self.lock:
+            self._drop_region(region_name)
+
+    def _drop_region(self, region_name):
+        for key in self._region_numbers.pop(region_name, ()):
+            postings = self.numbers.get(key, {})
+            postings.pop(region_name, None)
+            if not postings:
+                self.numbers.pop(key, None)
+                self.labels.pop(key, None)
+        for token in self._region_tokens.pop(region_name, ()):
+            postings = self.tokens.get(token, {})
+            postings.pop(region_name, None)
+            if not postings:
+                del self.tokens[token]
+                self._vocabulary = None
+        self._normalized.pop(region_name, None)
+
+    def occurrences(self, number):
+        """Nömrənin rayonlar üzrə sayı: {rayon: maddə sayı}"""
+        with self.lock:
+            postings = self.numbers.get(normalize_number(number), {})
+            return {region_name: posting[0] for region_name, posting in postings.items()}
+
+    def _prefix_tokens(self, prefix):
+        """`prefix` ilə başlayan bütün sözlər (sıralanmış lüğətdə ikili axtarış)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.tokens)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def candidate_regions(self, query):
+        """Sorğuya uyğun maddəsi ola biləcək rayonlar"""
+        with self.lock:
+            return self._candidate_regions(query)
+
+    def _candidate_regions(self, query):
+        regions = set(self.numbers.get(normalize_number(query), {}))
+        words = tokenize(query)
+        if words:
+            matched = None
+            for word in words:
+                word_regions = set()
+                for token in self._prefix_tokens(word):
+                    word_regions.update(self.tokens[token])
+                matched = word_regions if matched is None else matched & word_regions
+                if not matched:
+                    break
+            regions |= matched
+        return regions
+
+    def _normalized_columns(self, region):
+        with self.lock:
+            cached = self._normalized.get(region.name)
+        if cached is None or cached[0] != region.version:
+            numbers = np.array([normalize_number(number) for number in region.numbers], dtype=object)
+            # Sözlər boşluqla ayrılır ki, söz başlanğıcı " söz" kimi axtarılsın
+            names = np.array([" " + " ".join(tokenize(name)) for name in region.names], dtype=str)
+            cached = (region.version, numbers, names)
+            with self.lock:
+                self._normalized[region.name] = cached
+        return cached[1], cached[2]
+
+    def match_region(self, region, query):
+        """Rayonda sorğuya uyğun maddələrin indeksləri (vektorlaşdırılmış)"""
+        numbers, names = self._normalized_columns(region)
+        matches = numbers == normalize_number(query)
+        words = tokenize(query)
+        if words and len(names):
+            name_matches = np.ones(len(names), dtype=bool)
+            for word in words:
+                name_matches &= np.char.find(names, " " + word) >= 0
+            matches |= name_matches
+        return np.flatnonzero(matches)
+
+
+def search_frame(book, query, limit=200):
+    """Bütün rayonlarda nömrə və ya ada görə axtarış (DataFrame, Məbləğ AZN ilə)"""
+    if not query.strip():
+        return pd.DataFrame(columns=SEARCH_COLUMNS)
+    index = book.item_index()
+    candidates = index.candidate_regions(query)
+    frames = []
+    found = 0
+    for region_name in [name for name in book.keys() if name in candidates]:
+        region = book[region_name]
+        indices = index.match_region(region, query)[:limit - found]
+        if not len(indices):
+            continue
+        frames.append(pd.DataFrame({
+            'Rayon': region_name,
+            'İndeks': indices,
+            'Maddə Nömrəsi': region.numbers[indices],
+            'Maddənin Adı': region.names[indices],
+            'Məbləğ': to_azn(region.amounts[indices]),
+        }))
+        found += len(indices)
+        if found >= limit:
+            break
+    if not frames:
+        return pd.DataFrame(columns=SEARCH_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def rollup_frame(index, min_regions=1):
+    """Maddə nömrəsi üzrə bütün rayonların cəmi - indeksdən, maddələr oxunmadan"""
+    with index.lock:
+        rows = [
+            (
+                index.labels[key],
+                len(postings),
+                sum(posting[0] for posting in postings.values()),
+                to_azn(sum(posting[1] for posting in postings.values())),
+            )
+            for key, postings in index.numbers.items() if len(postings) >= min_regions
+        ]
+    rollup_df = pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+    return rollup_df.sort_values('Məbləğ', ascending=False, ignore_index=True)
@@ -0,0 +1,208 @@
+"""Dəyişiklik jurnalı - geri al / təkrarla və keçmiş vəziyyətlərin bərpası"""
+import bisect
+import time
+from collections import Counter, namedtuple
+
+# Jurnalın bir addımı: bir və ya bir neçə (batch) dəyişiklik
+JournalEntry = namedtuple('JournalEntry', ['time', 'events'])
+
+# Tarixçədə göstərilən əməliyyat adları
+OP_LABELS = {
+    'set_budget': "büdcə",
+    'add': "əlavə",
+    'insert': "əlavə",
+    'update': "yeniləmə",
+    'delete': "silmə",
+    'truncate': "silmə",
+    'set_amounts': "yeniləmə",
+}
+
+
+class RegionJournal:
+    """Bir rayonun dəyişiklik jurnalı
+
+    RegionBudget dinləyicisi kimi qoşulur və hər dəyişikliyi köhnə dəyərləri ilə
+    birlikdə yazır. Hər `snapshot_every` addımdan bir rayonun tam nüsxəsi saxlanılır,
+    ona görə keçmiş vəziyyəti bərpa etmək üçün ən çox bu qədər addım təkrarlanır.
+    Jurnal `max_entries` addımdan uzun olduqda köhnə addımlar yeni başlanğıc
+    nüsxəsinə yığılır. Başlanğıc nüsxə ilk dəyişiklikdə alınır - heç dəyişdirilməyən
+    (yalnız oxunan) rayonlar üçün nüsxə saxlanılmır.
+    """
+
+    def __init__(self, region, snapshot_every=50, max_entries=500):
+        self.region = region
+        self.snapshot_every = max(1, snapshot_every)
+        self.max_entries = max(self.snapshot_every, max_entries)
+        self.entries = []
+        # entries[0]-ın mütləq mövqeyi və cari mövqe (tətbiq edilmiş addımlar)
+        self.base = 0
+        self.position = 0
+        self.snapshots = {}
+        self._pending = []
+        self._replaying = False
+
+    def __call__(self, region, op, *args):
+        if self._replaying:
+            return
+        if op == 'commit':
+            self._flush()
+            return
+        if op == 'add':
+            start, numbers, names, amounts = args
+            # Bildirişdəki massivlər buferin görünüşləridir - nüsxə saxla
+            args = (start, numbers.copy(), names.copy(), amounts.copy())
+        elif op == 'set_amounts':
+            indices, amounts, old_amounts = args
+            args = (indices.copy(), amounts.copy(), old_amounts)
+        if not self.snapshots:
+            self.snapshots[self.position] = _capture_before(region, (op, *args))
+        self._pending.append((op, *args))
+        if not region.in_batch:
+            self._flush()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def end(self):
+        return self.base + len(self.entries)
+
+    def can_undo(self):
+        return self.position > self.base
+
+    def can_redo(self):
+        return self.position < self.end
+
+    def _flush(self):
+        if not self._pending:
+            return
+        events, self._pending = tuple(self._pending), []
+        # Yeni dəyişiklik təkrarlana bilən addımları ləğv edir
+        del self.entries[self.position - self.base:]
+        for pos in [pos for pos in self.snapshots if pos > self.position]:
+            del self.snapshots[pos]
+        self.entries.append(JournalEntry(time.time(), events))
+        self.position += 1
+        if self.position % self.snapshot_every == 0:
+            self.snapshots[self.position] = _capture(self.region)
+        self._compact()
+
+    def _compact(self):
+        """Köhnə addımları başlanğıc nüsxəsinə yığ"""
+        if len(self.entries) <= self.max_entries + self.snapshot_every:
+            return
+        new_base = self.end - self.max_entries
+        if new_base not in self.snapshots:
+            self.snapshots[new_base] = _capture(self.state_at(new_base))
+        del self.entries[:new_base - self.base]
+        for pos in [pos for pos in self.snapshots if pos < new_base]:
+            del self.snapshots[pos]
+        self.base = new_base
+
+    def _replay(self, changes):
+        """Dəyişiklikləri rayona tətbiq et (saxlama qatı və digər dinləyicilər də yenilənir)"""
+        self._replaying = True
+        try:
+            with self.region.batch():
+                for change in changes:
+                    self.region.apply_change(*change)
+        finally:
+            self._replaying = False
+
+    def undo(self):
+        """Son addımı geri al"""
+        if not self.can_undo():
+            return False
+        entry = self.entries[self.position - self.base - 1]
+        self._replay(_inverse(event) for event in reversed(entry.events))
+        self.position -= 1
+        return True
+
+    def redo(self):
+        """Geri alınmış addımı təkrarla"""
+        if not self.can_redo():
+            return False
+        entry = self.entries[self.position - self.base]
+        self._replay(_forward(event) for event in entry.events)
+        self.position += 1
+        return True
+
+    def state_at(self, position):
+        """Verilmiş mövqedəki vəziyyəti ayrıca RegionBudget kimi bərpa et (audit üçün)"""
+        if not self.base <= position <= self.end:
+            raise IndexError(f"Jurnal mövqeyi {position} mövcud deyil")
+        # Hələ dəyişiklik yoxdursa yeganə vəziyyət rayonun özüdür
+        snapshots = self.snapshots or {self.base: _capture(self.region)}
+        positions = sorted(snapshots)
+        start = positions[bisect.bisect_right(positions, position) - 1]
+        total_qepik, numbers, names, amounts = snapshots[start]
+
+        state = type(self.region)(self.region.name)
+        state.total_qepik = total_qepik
+        state.apply_change('add', numbers, names, amounts)
+        for entry in self.entries[start - self.base:position - self.base]:
+            for event in entry.events:
+                state.apply_change(*_forward(event))
+        return state
+
+    def history(self):
+        """Addımların siyahısı: (mövqe, vaxt, qısa təsvir)"""
+        rows = []
+        for offset, entry in enumerate(self.entries):
+            counts = Counter()
+            for op, *args in entry.events:
+                if op in ('add', 'truncate'):
+                    counts[OP_LABELS[op]] += len(args[1])
+                elif op == 'set_amounts':
+                    counts[OP_LABELS[op]] += len(args[0])
+                else:
+                    counts[OP_LABELS[op]] += 1
+            summary = ", ".join(f"{count} {label}" for label, count in counts.items())
+            rows.append((self.base + offset + 1, entry.time, summary))
+        return rows
+
+
+def _capture(region):
+    """Rayonun tam nüsxəsi: (ümumi qəpik, nömrələr, adlar, qəpiklər)"""
+    return region.total_qepik, region.numbers.copy(), region.names.copy(), region.amounts.copy()
+
+
+def _capture_before(region, event):
+    """Rayonun `event`-dən əvvəlki nüsxəsi (bildiriş dəyişiklik tətbiq edildikdən sonra gəlir)"""
+    state = type(region)(region.name)
+    state.total_qepik = region.total_qepik
+    state.apply_change('add', region.numbers, region.names, region.amounts)
+    state.apply_change(*_inverse(event))
+    return _capture(state)
+
+
+def _forward(event):
+    """Bildirişdən dəyişikliyi yenidən tətbiq etmək üçün arqumentlər"""
+    op, *args = event
+    if op == 'set_budget':
+        return op, args[0]
+    if op == 'add':
+        return op, *args[1:]
+    if op in ('insert', 'update'):
+        return (op, *args[:4])
+    if op == 'set_amounts':
+        return op, args[0], args[1]
+    return op, args[0]
+
+
+def _inverse(event):
+    """Bildirişdən dəyişikliyi geri almaq üçün arqumentlər"""
+    op, *args = event
+    if op == 'set_budget':
+        return op, args[1]
+    if op == 'add':
+        return 'truncate', args[0]
+    if op == 'truncate':
+        return ('add', *args[1:])
+    if op == 'insert':
+        return 'delete', args[0]
+    if op == 'update':
+        return ('update', args[0], *args[4:])
+    if op == 'set_amounts':
+        return op, args[0], args[2]
+    return ('insert', *args)
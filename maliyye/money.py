@@ -0,0 +1,95 @@
+"""Pul hesabı - məbləğlər tam ədəd qəpiklə (int64) saxlanılır
+
+Qaydalar:
+- AZN məbləği ən yaxın qəpiyə yuvarlaqlaşdırılır (yarım qəpik yuxarı, sıfırdan uzağa).
+- Faizlər faizin yüzdə biri (0.01%) vahidində tam ədədlərdir. Maddələrin faizləri
+  ən böyük qalıq üsulu ilə bölüşdürülür ki, onların cəmi istifadə edilən payın
+  yuvarlaqlaşdırılmış faizinə dəqiq bərabər olsun.
+"""
+import numpy as np
+
+QEPIK_PER_AZN = 100
+# 100% = 10000 (faizin yüzdə biri)
+FULL_SHARE = 10000
+
+
+def to_qepik_array(amounts):
+    """AZN məbləğlərini qəpiyə (int64) çevir"""
+    values = np.asarray(amounts, dtype=np.float64)
+    # Üzən nöqtə xətasını (1.005 * 100 = 100.4999...) yuvarlaqlaşdırmadan əvvəl təmizlə
+    scaled = np.round(np.abs(values) * QEPIK_PER_AZN, 6)
+    return (np.sign(values) * np.floor(scaled + 0.5)).astype(np.int64)
+
+
+def to_qepik(amount):
+    """Bir AZN məbləğini qəpiyə çevir"""
+    return int(to_qepik_array([float(amount)])[0])
+
+
+def to_azn(qepik):
+    """Qəpiyi AZN-ə çevir (göstərmək üçün)"""
+    if isinstance(qepik, np.ndarray):
+        return qepik / QEPIK_PER_AZN
+    return int(qepik) / QEPIK_PER_AZN
+
+
+def share(part, total):
+    """`part`-ın `total`-dakı payı, faizin yüzdə biri ilə (yarım yuxarı)"""
+    if total <= 0:
+        return 0
+    return (2 * FULL_SHARE * int(part) + int(total)) // (2 * int(total))
+
+
+def shares(parts, totals):
+    """`share`-in vektorlaşdırılmış forması"""
+    parts = np.asarray(parts, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    safe_totals = np.where(totals > 0, totals, 1)
+    return np.where(totals > 0, (2 * FULL_SHARE * parts + safe_totals) // (2 * safe_totals), 0)
+
+
+def allocate_shares(amounts, total):
+    """Maddələrin faizlərini (0.01% vahidində) bölüşdür
+
+    Nəticənin cəmi share(sum(amounts), total)-a dəqiq bərabərdir.
+    """
+    amounts = np.asarray(amounts, dtype=np.int64)
+    if total <= 0 or len(amounts) == 0:
+        return np.zeros(len(amounts), dtype=np.int64)
+    floors, remainders = np.divmod(amounts * FULL_SHARE, int(total))
+    shortfall = share(int(amounts.sum()), total) - int(floors.sum())
+    if shortfall > 0:
+        # Ən böyük qalığı olan maddələrə bir vahid əlavə et (bərabərlikdə əvvəlki maddə)
+        order = np.argsort(-remainders, kind='stable')
+        floors[order[:shortfall]] += 1
+    return floors
+
+
+def allocate(total, weights):
+    """`total` qəpiyi çəkilərə mütənasib bölüşdür (ən böyük qalıq üsulu)
+
+    Nəticə tam qəpiklərdir və cəmi `total`-a dəqiq bərabərdir.
+    """
+    weights = np.asarray(weights, dtype=np.int64)
+    weight_sum = int(weights.sum())
+    if weight_sum <= 0 or total <= 0:
+        return np.zeros(len(weights), dtype=np.int64)
+    # Böyük məbləğlərdə int64 hasili daşa bilər - kvotalar float ilə, fərq qalıqlarla düzəldilir
+    quotas = weights * (int(total) / weight_sum)
+    floors = np.floor(quotas).astype(np.int64)
+    remainders = quotas - floors
+    shortfall = int(total) - int(floors.sum())
+    if shortfall > 0:
+        order = np.argsort(-remainders, kind='stable')
+        floors[order[:shortfall]] += 1
+    elif shortfall < 0:
+        order = np.argsort(np.where(floors > 0, remainders, np.inf), kind='stable')
+        floors[order[:-shortfall]] -= 1
+    return floors
+
+
+def share_to_percentage(value):
+    """0.01% vahidini faiz ədədinə çevir (göstərmək üçün)"""
+    if isinstance(value, np.ndarray):
+        return value / (FULL_SHARE // 100)
+    return int(value) / (FULL_SHARE // 100)
@@ -0,0 +1,93 @@
+"""Rerun profilləşdirməsi - bölmələr (tab-lar) üzrə müddət və yaddaş"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss():
+    """Prosesin pik rezident yaddaşı (bayt), ölçmək mümkün deyilsə None"""
+    if resource is None:
+        return None
+    # Linux-da ru_maxrss KB ilə, macOS-da baytla verilir
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+class RerunProfiler:
+    """Bir rerun-un bölmələri üzrə müddət və yaddaş ölçüləri
+
+    Söndürüldükdə section() heç nə ölçmür. Yaddaş tracemalloc ilə ölçülür - bu
+    bütün proses üçün ortaqdır, ona görə eyni anda işləyən sessiyalar bir-birinin
+    ölçülərinə təsir edə bilər və izləmə özü də rerun-u bir qədər ləngidir. İzləməni
+    başladan profiler onu record()-da dayandırır ki, digər sessiyalar ləngiməsin.
+    """
+
+    def __init__(self, enabled=False, trace_memory=True, started=None):
+        self.enabled = enabled
+        self.started = time.perf_counter() if started is None else started
+        # ad -> (saniyə, yaddaş artımı, pik artım) - baytla
+        self.sections = {}
+        # Rerun st.rerun() ilə yarımçıq qalıb record() çağırılmadıqda izləmə açıq qalır -
+        # onu növbəti rerun-un profileri götürür və dayandırır
+        self._owns_tracing = enabled and trace_memory
+        if self._owns_tracing and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def section(self, name):
+        """Bölmənin müddətini və ayırdığı yaddaşı ölç (bölmələr iç-içə olmamalıdır)"""
+        if not self.enabled:
+            yield
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            # Başqa sessiyanın profileri izləməni bu arada dayandırmış ola bilər
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                self.sections[name] = (elapsed, current - before, peak - before)
+            else:
+                self.sections[name] = (elapsed, None, None)
+
+    def record(self):
+        """Rerun-un ölçüləri: {'total': saniyə, 'rss': bayt, 'sections': {...}}"""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        return {
+            'total': time.perf_counter() - self.started,
+            'rss': peak_rss(),
+            'sections': dict(self.sections),
+        }
+
+
+def summarize(records):
+    """Rerun ölçülərindən bölmələr üzrə son/orta/maksimum müddət və orta yaddaş (sətrlər)"""
+    rows = {}
+    for record in records:
+        for name, (elapsed, allocated, peak) in record['sections'].items():
+            rows.setdefault(name, []).append((elapsed, allocated, peak))
+    summary = []
+    for name, values in rows.items():
+        times = [elapsed for elapsed, _, _ in values]
+        peaks = [peak for _, _, peak in values if peak is not None]
+        summary.append({
+            'Bölmə': name,
+            'Son (ms)': round(times[-1] * 1000, 1),
+            'Orta (ms)': round(sum(times) / len(times) * 1000, 1),
+            'Maks (ms)': round(max(times) * 1000, 1),
+            'Pik yaddaş (KB)': round(sum(peaks) / len(peaks) / 1024, 1) if peaks else None,
+        })
+    return summary
@@ -0,0 +1,7 @@
+"""İdxal qaydaları - ağır kitabxanalar olmadan (əmr sətri də istifadə edir)"""
+
+# Eyni rayon bir neçə faylda (və ya artıq kitabda) olduqda qaydalar:
+#   replace - sonuncu fayl əvvəlkini əvəz edir
+#   keep    - mövcud məlumat saxlanılır, yenisi buraxılır
+#   merge   - maddələr birləşdirilir, ümumi büdcələr toplanır
+CONFLICT_RULES = ['replace', 'keep', 'merge']
@@ -0,0 +1,200 @@
+"""Ssenarilər - büdcə dəyişikliklərinin "nə olar?" təhlili
+
+Ssenari əsas məlumatın üzərində ardıcıl addımlardır (mütənasib artım/azalma, büdcəyə
+uyğunlaşdırma, maksimum məbləğ, prioritetə görə bölüşdürmə). Hər addım rayonun
+məbləğ massivi üzərində vektorlaşdırılmış hesablanır. Nəticə rayonun tam nüsxəsi
+kimi deyil, yalnız dəyişən maddələrin fərqi (diff) kimi saxlanılır və rayonun
+versiyası dəyişmədikcə yenidən hesablanmır.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .money import allocate, to_azn, to_qepik
+
+# Addım: əməliyyat, parametrlər və rayonlar (None - bütün rayonlar)
+ScenarioStep = namedtuple('ScenarioStep', ['op', 'params', 'regions'])
+
+# Rayon üzrə fərq: yeni ümumi büdcə (qəpik) və dəyişən maddələrin indeksləri/məbləğləri
+RegionDiff = namedtuple('RegionDiff', ['total_qepik', 'indices', 'amounts'])
+
+OPERATION_LABELS = {
+    'scale': "Maddələri faizlə dəyiş",
+    'budget': "Büdcəni faizlə dəyiş",
+    'fit': "Maddələri büdcəyə uyğunlaşdır",
+    'cap': "Maksimum maddə məbləği",
+    'priority': "Prioritetə görə bölüşdür",
+}
+
+
+def scale_amounts(amounts, percent):
+    """Bütün maddələri `percent` faiz dəyiş - yeni cəm dəqiq yuvarlaqlaşdırılır"""
+    target = int(np.floor(int(amounts.sum()) * (1 + percent / 100) + 0.5))
+    return allocate(max(target, 0), amounts)
+
+
+def scale_total(total_qepik, percent):
+    return max(int(np.floor(total_qepik * (1 + percent / 100) + 0.5)), 0)
+
+
+def fit_amounts(amounts, total_qepik):
+    """Büdcə aşılırsa maddələri mütənasib azalt"""
+    if int(amounts.sum()) <= total_qepik:
+        return amounts
+    return allocate(total_qepik, amounts)
+
+
+def cap_amounts(amounts, cap_qepik):
+    return np.minimum(amounts, cap_qepik)
+
+
+def priority_levels(numbers, prefixes):
+    """Maddə nömrəsinin prefiksinə görə prioritet (0 - ən yüksək, uyğunsuzlar ən sonda)"""
+    numbers = np.asarray(numbers, dtype=object).astype(str)
+    levels = np.full(len(numbers), len(prefixes), dtype=np.int64)
+    for level in range(len(prefixes) - 1, -1, -1):
+        levels[np.char.startswith(numbers, prefixes[level])] = level
+    return levels
+
+
+def prioritize_amounts(amounts, levels, total_qepik):
+    """Büdcəni prioritet sırası ilə ver: yüksək prioritetli qruplar tam maliyyələşir,
+    büdcənin çatmadığı qrup mütənasib azaldılır, sonrakılar sıfırlanır"""
+    if int(amounts.sum()) <= total_qepik:
+        return amounts
+    groups, inverse = np.unique(levels, return_inverse=True)
+    group_sums = np.zeros(len(groups), dtype=np.int64)
+    np.add.at(group_sums, inverse, amounts)
+    funded = np.cumsum(group_sums) <= total_qepik
+    result = np.where(funded[inverse], amounts, 0)
+    partial = np.flatnonzero(~funded)
+    if len(partial):
+        group = partial[0]
+        mask = inverse == group
+        available = total_qepik - int(group_sums[:group].sum())
+        result[mask] = allocate(available, amounts[mask])
+    return result
+
+
+def _apply_step(step, total_qepik, amounts, numbers):
+    """Bir addımı (ümumi büdcə, məbləğlər) cütünə tətbiq et"""
+    op, params = step.op, step.params
+    if op == 'scale':
+        return total_qepik, scale_amounts(amounts, params['percent'])
+    if op == 'budget':
+        return scale_total(total_qepik, params['percent']), amounts
+    if op == 'fit':
+        return total_qepik, fit_amounts(amounts, total_qepik)
+    if op == 'cap':
+        return total_qepik, cap_amounts(amounts, to_qepik(params['amount']))
+    if op == 'priority':
+        levels = priority_levels(numbers, params['prefixes'])
+        return total_qepik, prioritize_amounts(amounts, levels, total_qepik)
+    raise ValueError(f"Naməlum əməliyyat: {op}")
+
+
+class Scenario:
+    """Adlandırılmış ssenari - addımlar və rayonlar üzrə keşlənmiş fərqlər"""
+
+    def __init__(self, name, steps=()):
+        self.name = name
+        self.steps = list(steps)
+        # rayon -> (rayonun versiyası, RegionDiff)
+        self._diffs = {}
+
+    def add_step(self, op, regions=None, **params):
+        if op not in OPERATION_LABELS:
+            raise ValueError(f"Naməlum əməliyyat: {op}")
+        self.steps.append(ScenarioStep(op, params, None if regions is None else frozenset(regions)))
+        self._diffs.clear()
+
+    def remove_step(self, position):
+        del self.steps[position]
+        self._diffs.clear()
+
+    def describe(self):
+        """Addımların oxunaqlı siyahısı"""
+        lines = []
+        for step in self.steps:
+            params = step.params
+            if 'percent' in params:
+                detail = f" ({params['percent']:+g}%)"
+            elif 'amount' in params:
+                detail = f" ({params['amount']:,.2f} AZN)"
+            elif 'prefixes' in params:
+                detail = f" ({' > '.join(params['prefixes'])})"
+            else:
+                detail = ""
+            scope = "bütün rayonlar" if step.regions is None else ", ".join(sorted(step.regions))
+            lines.append(f"{OPERATION_LABELS[step.op]}{detail} - {scope}")
+        return lines
+
+    def affects(self, name):
+        return any(step.regions is None or name in step.regions for step in self.steps)
+
+    def diff(self, region):
+        """Rayon üçün fərq (rayonun versiyası dəyişmədikcə keşdən)"""
+        cached = self._diffs.get(region.name)
+        if cached is not None and cached[0] == region.version:
+            return cached[1]
+
+        total_qepik, amounts = region.total_qepik, region.amounts
+        for step in self.steps:
+            if step.regions is None or region.name in step.regions:
+                total_qepik, amounts = _apply_step(step, total_qepik, amounts, region.numbers)
+        indices = np.flatnonzero(amounts != region.amounts)
+        result = RegionDiff(total_qepik, indices, np.asarray(amounts)[indices])
+        self._diffs[region.name] = (region.version, result)
+        return result
+
+    def amounts(self, region):
+        """Ssenaridən sonra rayonun bütün məbləğləri (qəpik)"""
+        result = self.diff(region)
+        amounts = region.amounts.copy()
+        amounts[result.indices] = result.amounts
+        return amounts
+
+    def region_totals(self, region):
+        """(ümumi büdcə, istifadə edilən, dəyişən maddə sayı) - qəpiklə"""
+        result = self.diff(region)
+        used = region.used_qepik + int(result.amounts.sum()) - int(region.amounts[result.indices].sum())
+        return result.total_qepik, used, len(result.indices)
+
+    def apply(self, book):
+        """Ssenarini kitaba tətbiq et - hər rayon bir addımda (geri alına bilər)
+
+        [(rayon, uğur, xəta mesajı)] qaytarır; büdcəsi aşılan rayonlar dəyişdirilmir.
+        """
+        outcomes = []
+        for name in [name for name in book.keys() if self.affects(name)]:
+            def change(region):
+                result = self.diff(region)
+                if not len(result.indices) and result.total_qepik == region.total_qepik:
+                    return True, ""
+                return region.apply_amounts(result.indices, result.amounts, result.total_qepik)
+
+            is_valid, error_msg = book.edit_region(name, change)
+            outcomes.append((name, is_valid, error_msg))
+        return outcomes
+
+
+def compare_scenarios(book, scenarios):
+    """Əsas məlumat və ssenarilər yan-yana: rayon üzrə büdcə, istifadə edilən və fərq (AZN)"""
+    rows = []
+    for name in book.keys():
+        region = book[name]
+        row = {
+            'Rayon': name,
+            'Büdcə': to_azn(region.total_qepik),
+            'İstifadə Edilən': to_azn(region.used_qepik),
+        }
+        for scenario in scenarios:
+            total_qepik, used_qepik, changed = scenario.region_totals(region)
+            row[f"{scenario.name}: Büdcə"] = to_azn(total_qepik)
+            row[f"{scenario.name}: İstifadə Edilən"] = to_azn(used_qepik)
+            row[f"{scenario.name}: Fərq"] = to_azn(used_qepik - region.used_qepik)
+            row[f"{scenario.name}: Dəyişən Maddə"] = changed
+            row[f"{scenario.name}: Büdcə Aşılıb"] = used_qepik > total_qepik
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,136 @@
+"""Kitabın sütunlu snapshot formatı (Parquet) - bütün rayonların sürətli saxlanması və yüklənməsi
+
+Bütün rayonlar bir tipli cədvəldədir: rayon, nömrə, ad, məbləğ (qəpik, int64). Hər
+rayon ayrıca row group kimi yazılır, ona görə seçilmiş rayonlar faylın qalanını
+oxumadan yüklənir. Rayonların sırası və ümumi büdcələri (boş rayonlar da daxil)
+sxemin metadata-sında saxlanılır. Excel mübadilə formatı olaraq qalır.
+
+pyarrow məcburi asılılıq deyil - yalnız snapshot funksiyaları çağırıldıqda yüklənir.
+"""
+import importlib.util
+import json
+
+import numpy as np
+
+from .buffer import ItemBuffer
+from .engine import RegionBudget
+from .money import to_azn
+
+SNAPSHOT_EXTENSION = ".parquet"
+SNAPSHOT_MIME = "application/vnd.apache.parquet"
+
+# Formatın versiyası - sxem dəyişdikdə artırılır
+FORMAT_VERSION = 1
+_METADATA_KEY = b"maliyye.snapshot"
+_ITEM_COLUMNS = ['number', 'name', 'amount_qepik']
+
+
+def snapshot_available():
+    """pyarrow quraşdırılıbmı"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Snapshot formatı üçün pyarrow lazımdır: pip install pyarrow") from exc
+    return pa, pq
+
+
+def _schema(pa, metadata=None):
+    return pa.schema([
+        ('region', pa.dictionary(pa.int32(), pa.string())),
+        ('number', pa.string()),
+        ('name', pa.string()),
+        ('amount_qepik', pa.int64()),
+    ], metadata=metadata)
+
+
+def _strings(pa, values):
+    """Obyekt massivini Arrow mətn sütununa çevir (nömrələr rəqəm də ola bilər)"""
+    try:
+        return pa.array(values, type=pa.string())
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def save_snapshot(book, target, regions=None):
+    """Kitabı (və ya yalnız `regions` rayonlarını) snapshot faylına yaz
+
+    `target` fayl yolu və ya yazıla bilən binar axındır.
+    """
+    pa, pq = _pyarrow()
+    names = list(book.keys()) if regions is None else [name for name in regions if name in book]
+
+    # [rayon, ümumi büdcə (qəpik), row group indeksi və ya None]
+    entries = []
+    tables = []
+    for name in names:
+        region = book[name]
+        row_group = None
+        if not region.empty:
+            row_group = len(tables)
+            count = len(region)
+            tables.append(pa.table([
+                pa.DictionaryArray.from_arrays(np.zeros(count, dtype=np.int32), [name]),
+                _strings(pa, region.numbers),
+                _strings(pa, region.names),
+                pa.array(region.amounts, type=pa.int64()),
+            ], schema=_schema(pa)))
+        entries.append([name, region.total_qepik, row_group])
+
+    metadata = {_METADATA_KEY: json.dumps(
+        {'version': FORMAT_VERSION, 'regions': entries}, ensure_ascii=False
+    ).encode("utf-8")}
+    with pq.ParquetWriter(target, _schema(pa, metadata), compression="zstd") as writer:
+        for table in tables:
+            writer.write_table(table, row_group_size=max(1, table.num_rows))
+
+
+def _open(source):
+    pa, pq = _pyarrow()
+    parquet_file = pq.ParquetFile(source, memory_map=isinstance(source, str))
+    metadata = parquet_file.schema_arrow.metadata or {}
+    if _METADATA_KEY not in metadata:
+        raise ValueError("Fayl maliyyə snapshot-u deyil")
+    header = json.loads(metadata[_METADATA_KEY].decode("utf-8"))
+    if header.get('version', 0) > FORMAT_VERSION:
+        raise ValueError(f"Snapshot formatının versiyası ({header['version']}) dəstəklənmir")
+    return parquet_file, header['regions']
+
+
+def snapshot_regions(source):
+    """Snapshot-dakı rayonlar: [(rayon, ümumi büdcə AZN, maddə sayı)] - maddələr oxunmur"""
+    parquet_file, entries = _open(source)
+    regions = []
+    for name, total_qepik, row_group in entries:
+        count = 0 if row_group is None else parquet_file.metadata.row_group(row_group).num_rows
+        regions.append((name, to_azn(total_qepik), count))
+    return regions
+
+
+def load_snapshot(source, regions=None):
+    """Snapshot-dan rayonları yüklə - {rayon: RegionBudget} qaytarır
+
+    `regions` verilərsə yalnız həmin rayonların row group-ları oxunur.
+    """
+    parquet_file, entries = _open(source)
+    wanted = None if regions is None else set(regions)
+
+    loaded = {}
+    for name, total_qepik, row_group in entries:
+        if wanted is not None and name not in wanted:
+            continue
+        if row_group is None:
+            buffer = ItemBuffer()
+        else:
+            table = parquet_file.read_row_group(row_group, columns=_ITEM_COLUMNS)
+            buffer = ItemBuffer.from_arrays(
+                table.column('number').to_numpy(zero_copy_only=False),
+                table.column('name').to_numpy(zero_copy_only=False),
+                table.column('amount_qepik').to_numpy(),
+            )
+        loaded[name] = RegionBudget.from_buffer(name, total_qepik, buffer)
+    return loaded
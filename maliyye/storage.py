@@ -0,0 +1,384 @@
+"""Büdcə məlumatlarının daimi saxlanması (SQLite)
+
+Məbləğlər tam ədəd qəpiklə saxlanılır.
+"""
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+import numpy as np
+
+from .buffer import ItemBuffer
+from .index import BookIndex
+
+
+class BudgetStore(ABC):
+    """Saxlama qatının interfeysi - RegionBudget dəyişikliklərini yazır
+
+    Bütün abstrakt metodları reallaşdırmayan sinifdən obyekt yaradıla bilməz.
+    Maddə indeksi saxlama qatınındır - onu istifadə edən bütün sessiyalar üçün bir
+    nüsxə saxlanılır və hər yazı ilə eyni kilid altında yenilənir. `_indexed_revisions`
+    indeksin hansı rayon revision-larını əks etdirdiyini saxlayır - başqa prosesin
+    yazdığı rayonlar növbəti müraciətdə yenidən oxunur.
+    """
+
+    def __init__(self):
+        self.index = BookIndex()
+        self._indexed_revisions = {}
+
+    def item_index(self):
+        """Ortaq maddə indeksi - ilk müraciətdə item_rows()-dan qurulur"""
+        with self.index.lock:
+            revisions = self.region_revisions()
+            if not self.index.built:
+                self.index.build(self.item_rows())
+            else:
+                stale = [name for name, rev in revisions.items() if self._indexed_revisions.get(name) != rev]
+                for name in stale + [name for name in self._indexed_revisions if name not in revisions]:
+                    self.index.drop_region(name)
+                if stale:
+                    self.index.build(self.item_rows(stale))
+            self._indexed_revisions = revisions
+        return self.index
+
+    @abstractmethod
+    def region_names(self):
+        raise NotImplementedError
+
+    def has_region(self, name):
+        return name in self.region_names()
+
+    @abstractmethod
+    def has_items(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_region(self, name):
+        """Rayonu (ümumi büdcə, ItemBuffer) kimi qaytar, yoxdursa None"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def region_stats(self, names=None):
+        """(rayon, ümumi büdcə, istifadə edilən, maddə sayı) sətrləri (`names` verilərsə yalnız onlar)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def top_items(self, n):
+        """Bütün rayonlar üzrə ən böyük `n` maddə: (rayon, nömrə, ad, məbləğ)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def item_rows(self, names=None):
+        """Maddələr rayon və mövqe sırası ilə: (rayon, nömrə, ad, məbləğ) (`names` verilərsə yalnız onlar)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_regions(self, regions):
+        """Rayonları tam yaz (idxal üçün - bir tranzaksiyada)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_region(self, name):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_total_budget(self, name, total_qepik):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_items(self, name, start, numbers, names, amounts):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_item(self, name, idx, number, item_name, amount):
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_item(self, name, idx, number, item_name, amount):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_item(self, name, idx):
+        raise NotImplementedError
+
+    @abstractmethod
+    def revision(self):
+        """Bütün saxlama qatının dəyişiklik sayğacı - hər yazıda artır"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def region_revisions(self):
+        """{rayon: son dəyişikliyin revision-u}"""
+        raise NotImplementedError
+
+    def region_revision(self, name):
+        return self.region_revisions().get(name)
+
+    @abstractmethod
+    def region_lock(self, name):
+        """Rayonun redaktə kilidi (yoxla-və-yaz əməliyyatları üçün)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def truncate_items(self, name, start):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_amounts(self, name, indices, amounts):
+        raise NotImplementedError
+
+    def __call__(self, region, op, *args):
+        """RegionBudget dinləyicisi - dəyişikliyi dərhal yaz və indeksi yenilə"""
+        # İndeks kilidi yazını da əhatə edir ki, eyni anda qurulan indeks onu iki dəfə saymasın
+        with self.index.lock:
+            self._write(region, op, args)
+            self.index(region, op, *args)
+
+    def _write(self, region, op, args):
+        if op == 'set_budget':
+            self.set_total_budget(region.name, args[0])
+        elif op == 'add':
+            self.add_items(region.name, *args)
+        elif op == 'insert':
+            self.insert_item(region.name, *args)
+        elif op == 'update':
+            self.update_item(region.name, *args[:4])
+        elif op == 'delete':
+            self.delete_item(region.name, args[0])
+        elif op == 'truncate':
+            self.truncate_items(region.name, args[0])
+        elif op == 'set_amounts':
+            self.update_amounts(region.name, args[0], args[1])
+
+
+class SqliteStore(BudgetStore):
+    """SQLite əsaslı saxlama - rayon və maddə nömrəsinə görə indekslənir"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS regions (
+            name TEXT PRIMARY KEY,
+            total_qepik INTEGER NOT NULL,
+            revision INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+        CREATE TABLE IF NOT EXISTS items (
+            region TEXT NOT NULL REFERENCES regions(name) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            number TEXT,
+            name TEXT,
+            amount_qepik INTEGER NOT NULL,
+            PRIMARY KEY (region, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_items_number ON items(number);
+        CREATE INDEX IF NOT EXISTS idx_items_region_number ON items(region, number);
+        CREATE INDEX IF NOT EXISTS idx_items_amount ON items(amount_qepik);
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        # Bağlantı kilidi yalnız SQL əmrləri müddətində tutulur; redaktə zamanı
+        # yoxla-və-yaz ardıcıllığı rayonun öz kilidi ilə qorunur
+        self._lock = threading.Lock()
+        self._region_locks = defaultdict(threading.RLock)
+        self._region_locks_guard = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(regions)")]
+        if 'revision' not in columns:
+            # Əvvəlki versiyada yaradılmış baza
+            with self._conn:
+                self._conn.execute("ALTER TABLE regions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _touch(self, name=None):
+        """Dəyişiklik sayğacını artır və rayona yeni revision ver (tranzaksiya daxilində)"""
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+        if name is not None:
+            self._conn.execute(
+                "UPDATE regions SET revision = (SELECT value FROM meta WHERE key = 'revision') WHERE name = ?",
+                (name,)
+            )
+            if self.index.built:
+                # Yazı indeks kilidi altındadır - indeks bu revision-u dərhal əks etdirəcək
+                self._indexed_revisions[name] = self._conn.execute(
+                    "SELECT value FROM meta WHERE key = 'revision'"
+                ).fetchone()[0]
+
+    def revision(self):
+        return self._query("SELECT value FROM meta WHERE key = 'revision'")[0][0]
+
+    def region_revisions(self):
+        return dict(self._query("SELECT name, revision FROM regions"))
+
+    def region_revision(self, name):
+        rows = self._query("SELECT revision FROM regions WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def region_lock(self, name):
+        with self._region_locks_guard:
+            return self._region_locks[name]
+
+    def region_names(self):
+        return [row[0] for row in self._query("SELECT name FROM regions ORDER BY rowid")]
+
+    def has_region(self, name):
+        return bool(self._query("SELECT 1 FROM regions WHERE name = ?", (name,)))
+
+    def has_items(self):
+        return bool(self._query("SELECT 1 FROM items LIMIT 1"))
+
+    def load_region(self, name):
+        rows = self._query("SELECT total_qepik FROM regions WHERE name = ?", (name,))
+        if not rows:
+            return None
+        items = self._query(
+            "SELECT number, name, amount_qepik FROM items WHERE region = ? ORDER BY position", (name,)
+        )
+        buffer = ItemBuffer(len(items))
+        if items:
+            numbers, names, amounts = zip(*items)
+            buffer.extend(numbers, names, np.array(amounts, dtype=np.int64))
+        return rows[0][0], buffer
+
+    def region_stats(self, names=None):
+        where, params = "", ()
+        if names is not None:
+            names = list(names)
+            where = f"WHERE r.name IN ({', '.join('?' * len(names))}) "
+            params = tuple(names)
+        return self._query(
+            "SELECT r.name, r.total_qepik, COALESCE(SUM(i.amount_qepik), 0), COUNT(i.position) "
+            "FROM regions r LEFT JOIN items i ON i.region = r.name "
+            f"{where}GROUP BY r.name ORDER BY r.rowid",
+            params
+        )
+
+    def top_items(self, n):
+        return self._query(
+            "SELECT region, number, name, amount_qepik FROM items ORDER BY amount_qepik DESC LIMIT ?", (n,)
+        )
+
+    def item_rows(self, names=None):
+        where, params = "", ()
+        if names is not None:
+            names = list(names)
+            where = f"WHERE region IN ({', '.join('?' * len(names))}) "
+            params = tuple(names)
+        return self._query(
+            f"SELECT region, number, name, amount_qepik FROM items {where}ORDER BY region, position", params
+        )
+
+    def save_regions(self, regions):
+        with self.index.lock, self._lock, self._conn:
+            for region in regions:
+                self._conn.execute("DELETE FROM items WHERE region = ?", (region.name,))
+                self._conn.execute(
+                    "INSERT INTO regions (name, total_qepik) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET total_qepik = excluded.total_qepik",
+                    (region.name, region.total_qepik)
+                )
+                self._conn.executemany(
+                    "INSERT INTO items (region, position, number, name, amount_qepik) VALUES (?, ?, ?, ?, ?)",
+                    _item_rows(region.name, 0, region.numbers, region.names, region.amounts)
+                )
+                self._touch(region.name)
+                if self.index.built:
+                    self.index.index_region(region)
+
+    def delete_region(self, name):
+        with self.index.lock, self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE region = ?", (name,))
+            self._conn.execute("DELETE FROM regions WHERE name = ?", (name,))
+            self._touch()
+            self.index.drop_region(name)
+            self._indexed_revisions.pop(name, None)
+
+    def set_total_budget(self, name, total_qepik):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE regions SET total_qepik = ? WHERE name = ?", (int(total_qepik), name)
+            )
+            self._touch(name)
+
+    def add_items(self, name, start, numbers, names, amounts):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO items (region, position, number, name, amount_qepik) VALUES (?, ?, ?, ?, ?)",
+                _item_rows(name, start, numbers, names, amounts)
+            )
+            self._touch(name)
+
+    def update_item(self, name, idx, number, item_name, amount):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE items SET number = ?, name = ?, amount_qepik = ? WHERE region = ? AND position = ?",
+                (_text(number), _text(item_name), int(amount), name, idx)
+            )
+            self._touch(name)
+
+    def insert_item(self, name, idx, number, item_name, amount):
+        with self._lock, self._conn:
+            # Mövqeləri unikallığı pozmadan iki addımda sürüşdür
+            self._conn.execute(
+                "UPDATE items SET position = -(position + 1) WHERE region = ? AND position >= ?",
+                (name, idx)
+            )
+            self._conn.execute(
+                "UPDATE items SET position = -position WHERE region = ? AND position < 0", (name,)
+            )
+            self._conn.executemany(
+                "INSERT INTO items (region, position, number, name, amount_qepik) VALUES (?, ?, ?, ?, ?)",
+                _item_rows(name, idx, [number], [item_name], [amount])
+            )
+            self._touch(name)
+
+    def delete_item(self, name, idx):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE region = ? AND position = ?", (name, idx))
+            # Mövqeləri unikallığı pozmadan iki addımda sürüşdür
+            self._conn.execute(
+                "UPDATE items SET position = -(position - 1) WHERE region = ? AND position > ?",
+                (name, idx)
+            )
+            self._conn.execute(
+                "UPDATE items SET position = -position WHERE region = ? AND position < 0", (name,)
+            )
+            self._touch(name)
+
+    def truncate_items(self, name, start):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE region = ? AND position >= ?", (name, start))
+            self._touch(name)
+
+    def update_amounts(self, name, indices, amounts):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE items SET amount_qepik = ? WHERE region = ? AND position = ?",
+                ((int(amount), name, int(idx)) for idx, amount in zip(indices, amounts))
+            )
+            self._touch(name)
+
+
+def _text(value):
+    """Maddə nömrəsi/adını mətn kimi saxla"""
+    return None if value is None else str(value)
+
+
+def _item_rows(name, start, numbers, names, amounts):
+    for offset, (number, item_name, amount) in enumerate(zip(numbers, names, amounts)):
+        yield name, start + offset, _text(number), _text(item_name), int(amount)
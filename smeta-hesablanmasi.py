@@ -1,8 +1,36 @@
 import streamlit as st
-import pandas as pd
+import plotly.express as px
 import io
+import json
+import os
+import time
+from collections import deque
 from datetime import datetime
 
+# Rerun müddətinin ölçülməsi (debug paneli üçün)
+RERUN_STARTED = time.perf_counter()
+
+from maliyye import (
+    REGIONS,
+    REQUIRED_COLUMNS,
+    BudgetBook,
+    SqliteStore,
+    WorkbookExporter,
+    format_percentage,
+    parse_pasted_items,
+)
+from maliyye.cache import VersionedCache
+from maliyye.excel_io import CONFLICT_RULES, EXCEL_MIME, ImportJob, import_files, sheet_names
+from maliyye.profiling import RerunProfiler, summarize
+from maliyye.scenario import OPERATION_LABELS, Scenario, compare_scenarios
+from maliyye.snapshot import (
+    SNAPSHOT_MIME,
+    load_snapshot,
+    save_snapshot,
+    snapshot_available,
+    snapshot_regions,
+)
+
 # Səhifə konfiqurasiyası
 st.set_page_config(
     page_title="Maliyyə Sistemi",
@@ -55,46 +83,140 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Rayonların siyahısı
-REGIONS = [
-    "Aparat", "Abşeron", "Ağcabədi", "Ağdam", "Ağdaş", "Ağdərə", "Ağstafa", "Ağsu", 
-    "Astara", "Bakı", "Babək (Naxçıvan MR)", "Balakən", "Bərdə", "Beyləqan", "Biləsuvar", 
-    "Cəbrayıl", "Cəlilabad", "Culfa (Naxçıvan MR)", "Daşkəsən", "Füzuli", "Gədəbəy", 
-    "Gəncə", "Goranboy", "Göyçay", "Göygöl", "Hacıqabul", "Xaçmaz", "Xankəndi", "Xızı", 
-    "Xocalı", "Xocavənd", "İmişli", "İsmayıllı", "Kəlbəcər", "Kəngərli (Naxçıvan MR)", 
-    "Kürdəmir", "Laçın", "Lənkəran", "Lerik", "Masallı", "Mingəçevir", "Naftalan", 
-    "Neftçala", "Naxçıvan", "Oğuz", "Siyəzən", "Ordubad (Naxçıvan MR)", "Qəbələ", 
-    "Qax", "Qazax", "Qobustan", "Quba", "Qubadlı", "Qusar", "Saatlı", "Sabirabad", 
-    "Sədərək (Naxçıvan MR)", "Salyan", "Samux", "Şabran", "Şahbuz (Naxçıvan MR)", 
-    "Şamaxı", "Şəki", "Şəmkir", "Şərur (Naxçıvan MR)", "Şirvan", "Şuşa", "Sumqayıt", 
-    "Tərtər", "Tovuz", "Ucar", "Yardımlı", "Yevlax", "Zaqatala", "Zəngilan", "Zərdab", 
-    "Nabran", "Xudat"
-]
+# Məlumat bazası - MALIYYE_DB boş olarsa məlumatlar yalnız sessiyada saxlanılır
+DB_PATH = os.environ.get("MALIYYE_DB", "maliyye.db")
+
+
+# Başqa sessiyaların dəyişikliklərinin yoxlanma intervalı (saniyə), 0 - söndürülüb
+REFRESH_SECONDS = float(os.environ.get("MALIYYE_REFRESH", "5"))
+
+# Debug paneli: MALIYYE_DEBUG=1 və ya ?debug=1
+DEBUG = os.environ.get("MALIYYE_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+# Profilləşdirmə: MALIYYE_PROFILE=1 və ya ?profile=1 - hər tab-ın müddəti. Yaddaş
+# (tracemalloc bütün prosesi ləngidir) yalnız MALIYYE_PROFILE=1 ilə ölçülür
+PROFILE_MEMORY = os.environ.get("MALIYYE_PROFILE") == "1"
+PROFILE = PROFILE_MEMORY or st.query_params.get("profile") == "1"
+profiler = RerunProfiler(enabled=PROFILE, trace_memory=PROFILE_MEMORY, started=RERUN_STARTED)
+
+
+@st.cache_resource
+def get_store(path):
+    """Bütün sessiyalar üçün ortaq SQLite bağlantısı"""
+    return SqliteStore(path)
+
+
+@st.cache_resource
+def get_view_cache():
+    """Törəmə cədvəl və qrafiklər üçün ortaq keş - (növ, rayon, versiya) açarı ilə"""
+    return VersionedCache(max_entries=256)
+
+
+view_cache = get_view_cache()
+
+
+def cached_display_frame(region):
+    """Rayonun göstərilən cədvəli (versiya dəyişmədikcə keşdən)"""
+    return view_cache.get('display', region.name, region.version, region.display_frame)
+
+
+def build_overview(book):
+    """Ümumi baxış tabının cədvəl və qrafikləri"""
+    overview_df = book.aggregates.frame()
+    if overview_df.empty:
+        return {'overview_df': overview_df}
+    
+    chart_df = overview_df.melt(
+        id_vars='Rayon',
+        value_vars=['Ümumi Büdcə', 'İstifadə Edilən'],
+        var_name='Göstərici',
+        value_name='Məbləğ (AZN)'
+    )
+    
+    top_items_df = book.top_items(10)
+    top_items_df['Məbləğ'] = top_items_df['Məbləğ'].map(lambda amount: f"{amount:,.2f} AZN")
+    
+    display_df = overview_df.copy()
+    for column in ['Ümumi Büdcə', 'İstifadə Edilən', 'Qalan Büdcə']:
+        display_df[column] = display_df[column].map(lambda amount: f"{amount:,.2f}")
+    display_df['Faiz'] = display_df['Faiz'].map(format_percentage)
+    display_df['Büdcə Aşılıb'] = display_df['Büdcə Aşılıb'].map({True: "⚠️ Bəli", False: "Xeyr"})
+    
+    return {
+        'overview_df': overview_df,
+        'totals': book.aggregates.totals(),
+        'bar_chart': px.bar(chart_df, x='Rayon', y='Məbləğ (AZN)', color='Göstərici', barmode='group'),
+        'pie_chart': px.pie(overview_df, names='Rayon', values='İstifadə Edilən'),
+        'top_items_df': top_items_df,
+        'display_df': display_df,
+    }
+
+
+def sync_budget_input():
+    """Büdcə sahəsinə seçilmiş rayonun saxlanılmış büdcəsini yaz (rayon yoxdursa 0)"""
+    book = st.session_state.budget_data
+    name = st.session_state.get("region_select")
+    st.session_state.budget_input = book[name].total_budget if name in book else 0.0
+
+
+def mark_budget_input_changed():
+    st.session_state.budget_input_changed = True
+
 
 # Session state başlatma
 if 'budget_data' not in st.session_state:
-    st.session_state.budget_data = {}
-
-def calculate_percentage(amount, total):
-    """Faiz hesablama funksiyası"""
-    if total == 0:
-        return 0
-    return round((amount / total) * 100, 2)
-
-def validate_budget(items_df, total_budget):
-    """Büdcə doğrulama funksiyası"""
-    if items_df.empty:
-        return True, ""
-    
-    total_items = items_df['Məbləğ'].sum()
-    if total_items > total_budget:
-        return False, f"Xəta: Maddələrin cəmi ({total_items:,.2f} AZN) ümumi büdcədən ({total_budget:,.2f} AZN) çoxdur!"
-    return True, ""
+    st.session_state.budget_data = BudgetBook(store=get_store(DB_PATH) if DB_PATH else None)
+if 'exporter' not in st.session_state:
+    st.session_state.exporter = WorkbookExporter()
+if 'editor_version' not in st.session_state:
+    st.session_state.editor_version = 0
+if 'rerun_times' not in st.session_state:
+    st.session_state.rerun_times = deque(maxlen=50)
+if 'scenarios' not in st.session_state:
+    st.session_state.scenarios = {}
+if 'rerun_profiles' not in st.session_state:
+    st.session_state.rerun_profiles = deque(maxlen=50)
+
+# Başqa sessiyaların dəyişdirdiyi rayonları yenilə (yalnız dəyişənlər yenidən yüklənir)
+with profiler.section("refresh"):
+    changed_regions = st.session_state.budget_data.refresh()
+if changed_regions:
+    st.toast(f"🔄 Başqa istifadəçi tərəfindən yeniləndi: {', '.join(changed_regions)}")
+    for name in changed_regions:
+        st.session_state.pop(f"edit_budget_{name}", None)
+    if st.session_state.get("region_select") in changed_regions:
+        if st.session_state.region_select in st.session_state.budget_data:
+            sync_budget_input()
+        else:
+            # Başqa istifadəçi rayonu silib - seçim sıfırlanır, rayon yenidən yaradılmır
+            st.session_state.region_select = "Seçin..."
+            st.session_state.budget_input = 0.0
+    if st.session_state.get("edit_region_select") in changed_regions:
+        # Köhnə məlumat üzərində edilmiş, saxlanılmamış redaktələr atılır
+        st.session_state.editor_version += 1
+        st.session_state.stale_edit_warning = st.session_state.edit_region_select
+
+
+if DB_PATH and REFRESH_SECONDS > 0:
+    @st.fragment(run_every=REFRESH_SECONDS)
+    def watch_changes():
+        """Ortaq bazanı izlə - başqa sessiya nəsə dəyişdikdə səhifəni yenilə"""
+        book = st.session_state.budget_data
+        # Sessiyaya kənardan verilmiş (bazasız) kitab izlənmir
+        if book.store is not None and book.store.revision() != book.seen_revision:
+            st.rerun()
+
+    watch_changes()
+
+# Redaktorda bir səhifədə göstərilən maddə sayı variantları
+PAGE_SIZES = [25, 50, 100]
 
 # Əsas tab səhifələri
-tab1, tab2, tab3 = st.tabs(["📊 Büdcə Planlaması", "📋 Məlumatları İdarə Et", "📁 Excel İdarəetməsi"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    "📊 Büdcə Planlaması", "📋 Məlumatları İdarə Et", "📁 Excel İdarəetməsi", "📈 Ümumi Baxış", "🧪 Ssenarilər"
+])
 
-with tab1:
+with tab1, profiler.section("tab1"):
     st.header("🏛️ Rayon və Büdcə Seçimi")
     
     col1, col2 = st.columns([1, 1])
@@ -103,7 +225,8 @@ with tab1:
         selected_region = st.selectbox(
             "Rayon seçin:",
             options=["Seçin..."] + REGIONS,
-            key="region_select"
+            key="region_select",
+            on_change=sync_budget_input
         )
     
     with col2:
@@ -111,25 +234,43 @@ with tab1:
             total_budget = st.number_input(
                 "Ümumi Məbləğ (Smeta) - AZN:",
                 min_value=0.0,
-                value=0.0,
                 step=100.0,
                 format="%.2f",
-                key="budget_input"
+                key="budget_input",
+                on_change=mark_budget_input_changed
             )
     
-    if selected_region != "Seçin..." and total_budget > 0:
+    # Büdcə yalnız istifadəçi sahəni dəyişdikdə yazılır - başqa sessiyanın saxladığı
+    # büdcə köhnə sahə dəyəri ilə üzərinə yazılmasın
+    budget_input_changed = st.session_state.pop("budget_input_changed", False)
+    
+    # Rayon yalnız istifadəçinin əməli ilə yaradılır (büdcə daxil edildikdə və ya düymə ilə) -
+    # başqa sessiyanın sildiyi rayon köhnə sahə dəyəri ilə yenidən yaranmasın
+    region_exists = selected_region != "Seçin..." and selected_region in st.session_state.budget_data
+    if selected_region != "Seçin..." and total_budget > 0 and not region_exists:
+        if budget_input_changed:
+            st.session_state.budget_data.get_or_create(selected_region, total_budget)
+            region_exists = True
+        else:
+            st.info(f"📝 {selected_region} rayonu mövcud deyil.")
+            if st.button(f"➕ {selected_region} rayonunu yarat", key="create_region"):
+                st.session_state.budget_data.get_or_create(selected_region, total_budget)
+                st.rerun()
+    
+    if region_exists and total_budget > 0:
         st.markdown("---")
         st.header("📝 Maddələr Siyahısı")
         
-        # Seçilmiş rayon üçün məlumatları başlat
-        if selected_region not in st.session_state.budget_data:
-            st.session_state.budget_data[selected_region] = {
-                'total_budget': total_budget,
-                'items': pd.DataFrame(columns=['Maddə Nömrəsi', 'Maddənin Adı', 'Məbləğ', 'Faiz'])
-            }
+        region = st.session_state.budget_data[selected_region]
         
         # Ümumi büdcəni yenilə
-        st.session_state.budget_data[selected_region]['total_budget'] = total_budget
+        if budget_input_changed and region.total_budget != total_budget:
+            is_valid, error_msg = st.session_state.budget_data.edit_region(
+                selected_region, lambda region: region.set_total_budget(total_budget)
+            )
+            if not is_valid:
+                st.error(error_msg)
+            region = st.session_state.budget_data[selected_region]
         
         # Yeni maddə əlavə etmə formu
         with st.expander("➕ Yeni Maddə Əlavə Et", expanded=True):
@@ -151,28 +292,26 @@ with tab1:
                     key="item_amount"
                 )
             
+            # Təkrar nömrə xəbərdarlığı (indeksdən, maddələr oxunmadan)
+            duplicate_count = 0
+            if item_number.strip():
+                duplicate_count, other_regions = st.session_state.budget_data.duplicates(selected_region, item_number)
+                if duplicate_count:
+                    st.warning(f"⚠️ {selected_region} rayonunda {item_number} nömrəli maddə artıq mövcuddur ({duplicate_count} dəfə)!")
+                    allow_duplicate = st.checkbox("Təkrar nömrə ilə yenə də əlavə et", key="allow_duplicate")
+                elif other_regions:
+                    st.info(f"ℹ️ {item_number} nömrəli maddə digər rayonlarda da var: {', '.join(other_regions)}")
+            
             if st.button("➕ Maddə Əlavə Et", key="add_item"):
-                if item_number and item_name and item_amount > 0:
-                    # Yeni maddə əlavə et
-                    current_items = st.session_state.budget_data[selected_region]['items'].copy()
-                    
-                    # Faizi hesabla
-                    percentage = calculate_percentage(item_amount, total_budget)
-                    
-                    new_item = pd.DataFrame({
-                        'Maddə Nömrəsi': [item_number],
-                        'Maddənin Adı': [item_name],
-                        'Məbləğ': [item_amount],
-                        'Faiz': [f"{percentage}%"]
-                    })
-                    
-                    updated_items = pd.concat([current_items, new_item], ignore_index=True)
-                    
-                    # Doğrulama
-                    is_valid, error_msg = validate_budget(updated_items, total_budget)
+                if duplicate_count and not allow_duplicate:
+                    st.error("❌ Təkrar nömrə! Nömrəni dəyişin və ya təkrar əlavəni təsdiqləyin.")
+                elif item_number and item_name and item_amount > 0:
+                    # Yeni maddə əlavə et (doğrulama ilə)
+                    is_valid, error_msg = st.session_state.budget_data.edit_region(
+                        selected_region, lambda region: region.add_item(item_number, item_name, item_amount)
+                    )
                     
                     if is_valid:
-                        st.session_state.budget_data[selected_region]['items'] = updated_items
                         st.success("✅ Maddə uğurla əlavə edildi!")
                         st.rerun()
                     else:
@@ -180,21 +319,53 @@ with tab1:
                 else:
                     st.error("❌ Bütün sahələri doldurun!")
         
-        # Cədvəli göstər
-        current_items = st.session_state.budget_data[selected_region]['items']
+        # Toplu əlavədən sonra təkrar nömrələr barədə xəbərdarlıq
+        duplicate_warning = st.session_state.pop("duplicate_warning", None)
+        if duplicate_warning and duplicate_warning[0] == selected_region:
+            st.warning(f"⚠️ Əlavə edilən maddələrdə təkrar nömrələr var: {', '.join(duplicate_warning[1])}")
         
-        if not current_items.empty:
-            st.subheader("📊 Mövcud Maddələr")
+        # Toplu əlavə etmə formu (Excel-dən kopyalanmış sətrlər)
+        with st.expander("📋 Toplu Maddə Əlavə Et", expanded=False):
+            pasted_text = st.text_area(
+                "Sətrləri yapışdırın (Nömrə, Ad, Məbləğ - tab ilə ayrılmış):",
+                key="bulk_items"
+            )
             
-            # Faizləri yenidən hesabla
-            for idx, row in current_items.iterrows():
-                amount = row['Məbləğ']
-                percentage = calculate_percentage(amount, total_budget)
-                current_items.at[idx, 'Faiz'] = f"{percentage}%"
+            if st.button("📋 Maddələri Əlavə Et", key="add_bulk_items"):
+                if pasted_text.strip():
+                    try:
+                        pasted_items = parse_pasted_items(pasted_text)
+                    except Exception as e:
+                        st.error(f"❌ Sətrlər oxunarkən xəta baş verdi: {str(e)}")
+                    else:
+                        # Rayonda artıq olan və ya yapışdırılanlar arasında təkrarlanan nömrələr
+                        pasted_numbers = pasted_items['Maddə Nömrəsi'].astype(str)
+                        duplicate_numbers = sorted(
+                            set(pasted_numbers[pasted_numbers.duplicated()])
+                            | {number for number in set(pasted_numbers)
+                               if st.session_state.budget_data.duplicates(selected_region, number)[0]}
+                        )
+                        is_valid, error_msg = st.session_state.budget_data.edit_region(
+                            selected_region, lambda region: region.add_items(pasted_items)
+                        )
+                        
+                        if is_valid:
+                            if duplicate_numbers:
+                                st.session_state.duplicate_warning = (selected_region, duplicate_numbers)
+                            st.success(f"✅ {len(pasted_items)} maddə uğurla əlavə edildi!")
+                            st.rerun()
+                        else:
+                            st.markdown(f'<div class="error-message">{error_msg}</div>', unsafe_allow_html=True)
+                else:
+                    st.error("❌ Ən azı bir sətr daxil edin!")
+        
+        # Cədvəli göstər
+        if not region.empty:
+            st.subheader("📊 Mövcud Maddələr")
             
             # Cədvəli göstər
             st.dataframe(
-                current_items,
+                cached_display_frame(region),
                 use_container_width=True,
                 hide_index=True
             )
@@ -202,12 +373,13 @@ with tab1:
             # Xülasə məlumatları
             col1, col2, col3 = st.columns(3)
             
-            total_items_amount = current_items['Məbləğ'].sum()
-            remaining_budget = total_budget - total_items_amount
-            used_percentage = calculate_percentage(total_items_amount, total_budget)
+            summary = region.summary()
+            total_items_amount = summary['used_amount']
+            remaining_budget = summary['remaining_budget']
+            used_percentage = summary['used_percentage']
             
             with col1:
-                st.metric("💰 Ümumi Büdcə", f"{total_budget:,.2f} AZN")
+                st.metric("💰 Ümumi Büdcə", f"{summary['total_budget']:,.2f} AZN")
             
             with col2:
                 st.metric("💸 İstifadə Edilən", f"{total_items_amount:,.2f} AZN", f"{used_percentage}%")
@@ -220,10 +392,10 @@ with tab1:
             progress = min(used_percentage / 100, 1.0)
             st.progress(progress)
             
-            if remaining_budget < 0:
+            if summary['over_budget']:
                 st.markdown('<div class="error-message">⚠️ Xəbərdarlıq: Büdcə aşılıb!</div>', unsafe_allow_html=True)
 
-with tab2:
+with tab2, profiler.section("tab2"):
     st.header("📋 Məlumatları İdarə Et və Redaktə Et")
     
     if st.session_state.budget_data:
@@ -239,12 +411,15 @@ with tab2:
             
             st.subheader(f"📊 {region_to_edit} - Məlumatları")
             
+            if st.session_state.pop("stale_edit_warning", None) == region_to_edit:
+                st.warning("⚠️ Bu rayon başqa istifadəçi tərəfindən dəyişdirildi - ən son məlumatlar göstərilir, saxlanılmamış dəyişikliklər ləğv edildi.")
+            
             # Ümumi büdcəni redaktə et
             col1, col2 = st.columns([1, 1])
             with col1:
                 new_total_budget = st.number_input(
                     "Ümumi Büdcəni Yenilə (AZN):",
-                    value=region_data['total_budget'],
+                    value=region_data.total_budget,
                     min_value=0.0,
                     step=100.0,
                     format="%.2f",
@@ -253,96 +428,184 @@ with tab2:
             
             with col2:
                 if st.button("💾 Büdcəni Yenilə", key=f"update_budget_{region_to_edit}"):
-                    st.session_state.budget_data[region_to_edit]['total_budget'] = new_total_budget
-                    st.success("✅ Büdcə yeniləndi!")
+                    is_valid, error_msg = st.session_state.budget_data.edit_region(
+                        region_to_edit, lambda region: region.set_total_budget(new_total_budget)
+                    )
+                    if is_valid:
+                        st.success("✅ Büdcə yeniləndi!")
+                        st.rerun()
+                    else:
+                        st.error(error_msg)
+            
+            # Geri al / təkrarla
+            journal = st.session_state.budget_data.journal(region_to_edit)
+            col1, col2, _ = st.columns([1, 1, 4])
+            with col1:
+                undo_clicked = st.button("↩️ Geri al", key=f"undo_{region_to_edit}", disabled=not journal.can_undo())
+            with col2:
+                redo_clicked = st.button("↪️ Təkrarla", key=f"redo_{region_to_edit}", disabled=not journal.can_redo())
+            if undo_clicked or redo_clicked:
+                def replay_journal(region):
+                    if undo_clicked:
+                        journal.undo()
+                    else:
+                        journal.redo()
+                
+                is_valid, error_msg = st.session_state.budget_data.edit_region(region_to_edit, replay_journal)
+                # Redaktor və büdcə sahəsi yeni vəziyyətdən qurulsun
+                st.session_state.editor_version += 1
+                st.session_state.pop(f"edit_budget_{region_to_edit}", None)
+                if is_valid:
                     st.rerun()
+                else:
+                    st.error(error_msg)
             
             # Maddələri göstər və redaktə et
-            current_items = region_data['items'].copy()
-            
-            if not current_items.empty:
+            if not region_data.empty:
                 st.subheader("✏️ Maddələri Redaktə Et")
                 
-                # Hər maddə üçün redaktə formu
-                for idx, row in current_items.iterrows():
-                    with st.expander(f"Maddə {idx + 1}: {row['Maddənin Adı']}", expanded=False):
-                        col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
-                        
-                        with col1:
-                            new_number = st.text_input(
-                                "Nömrə:",
-                                value=row['Maddə Nömrəsi'],
-                                key=f"edit_number_{region_to_edit}_{idx}"
-                            )
-                        
-                        with col2:
-                            new_name = st.text_input(
-                                "Ad:",
-                                value=row['Maddənin Adı'],
-                                key=f"edit_name_{region_to_edit}_{idx}"
-                            )
+                # Axtarış və səhifələmə
+                col1, col2, col3 = st.columns([2, 1, 1])
+                
+                with col1:
+                    search_query = st.text_input(
+                        "🔍 Nömrə və ya ada görə axtar:",
+                        key=f"edit_search_{region_to_edit}"
+                    )
+                
+                matched_indices = region_data.find_items(search_query.strip())
+                
+                with col2:
+                    page_size = st.selectbox(
+                        "Səhifədə maddə sayı:",
+                        options=PAGE_SIZES,
+                        key=f"edit_page_size_{region_to_edit}"
+                    )
+                
+                page_count = max(1, -(-len(matched_indices) // page_size))
+                
+                with col3:
+                    page = st.number_input(
+                        f"Səhifə (cəmi {page_count}):",
+                        min_value=1,
+                        max_value=page_count,
+                        value=1,
+                        step=1,
+                        key=f"edit_page_{region_to_edit}"
+                    )
+                
+                page_indices = matched_indices[(page - 1) * page_size:page * page_size]
+                
+                if len(page_indices) == 0:
+                    st.info("🔍 Axtarışa uyğun maddə tapılmadı.")
+                else:
+                    # Yalnız cari səhifə redaktora verilir
+                    page_items = region_data.to_frame(page_indices)[REQUIRED_COLUMNS]
+                    page_items['Sil'] = False
+                    
+                    edited_items = st.data_editor(
+                        page_items,
+                        column_config={
+                            'Maddə Nömrəsi': st.column_config.TextColumn("Nömrə", required=True),
+                            'Maddənin Adı': st.column_config.TextColumn("Ad", required=True),
+                            'Məbləğ': st.column_config.NumberColumn("Məbləğ", min_value=0.0, step=10.0, format="%.2f", required=True),
+                            'Sil': st.column_config.CheckboxColumn("🗑️ Sil"),
+                        },
+                        num_rows="fixed",
+                        use_container_width=True,
+                        key=f"item_editor_{region_to_edit}_{page}_{st.session_state.editor_version}"
+                    )
+                    
+                    st.caption(f"Göstərilir: {len(page_indices)} / {len(matched_indices)} maddə (cəmi {len(region_data)})")
+                    
+                    if st.button("💾 Dəyişiklikləri Saxla", key=f"save_edits_{region_to_edit}"):
+                        # Yalnız dəyişmiş sətrlər tətbiq edilir
+                        changed = (edited_items[REQUIRED_COLUMNS] != page_items[REQUIRED_COLUMNS]).any(axis=1)
+                        updates = {
+                            idx: (row['Maddə Nömrəsi'], row['Maddənin Adı'], row['Məbləğ'])
+                            for idx, row in edited_items[changed].iterrows()
+                        }
+                        deletions = edited_items.index[edited_items['Sil']].tolist()
                         
-                        with col3:
-                            new_amount = st.number_input(
-                                "Məbləğ:",
-                                value=float(row['Məbləğ']),
-                                min_value=0.0,
-                                step=10.0,
-                                format="%.2f",
-                                key=f"edit_amount_{region_to_edit}_{idx}"
+                        if not updates and not deletions:
+                            st.info("📝 Dəyişiklik yoxdur.")
+                        else:
+                            is_valid, error_msg = st.session_state.budget_data.edit_region(
+                                region_to_edit,
+                                lambda region: region.apply_edits(updates, deletions, total_budget=new_total_budget)
                             )
-                        
-                        with col4:
-                            col4a, col4b = st.columns(2)
-                            with col4a:
-                                if st.button("💾", key=f"update_item_{region_to_edit}_{idx}", help="Yenilə"):
-                                    # Maddəni yenilə
-                                    current_items.at[idx, 'Maddə Nömrəsi'] = new_number
-                                    current_items.at[idx, 'Maddənin Adı'] = new_name
-                                    current_items.at[idx, 'Məbləğ'] = new_amount
-                                    
-                                    # Doğrulama
-                                    is_valid, error_msg = validate_budget(current_items, new_total_budget)
-                                    
-                                    if is_valid:
-                                        st.session_state.budget_data[region_to_edit]['items'] = current_items
-                                        st.success("✅ Maddə yeniləndi!")
-                                        st.rerun()
-                                    else:
-                                        st.error(error_msg)
                             
-                            with col4b:
-                                if st.button("🗑️", key=f"delete_item_{region_to_edit}_{idx}", help="Sil"):
-                                    # Maddəni sil
-                                    updated_items = current_items.drop(idx).reset_index(drop=True)
-                                    st.session_state.budget_data[region_to_edit]['items'] = updated_items
-                                    st.success("✅ Maddə silindi!")
-                                    st.rerun()
+                            if is_valid:
+                                st.session_state.editor_version += 1
+                                st.success(f"✅ {len(updates)} maddə yeniləndi, {len(deletions)} maddə silindi!")
+                                st.rerun()
+                            else:
+                                st.error(error_msg)
                 
                 # Yenilənmiş cədvəli göstər
-                updated_items = st.session_state.budget_data[region_to_edit]['items']
-                if not updated_items.empty:
-                    # Faizləri yenidən hesabla
-                    total_budget_current = st.session_state.budget_data[region_to_edit]['total_budget']
-                    for idx, row in updated_items.iterrows():
-                        amount = row['Məbləğ']
-                        percentage = calculate_percentage(amount, total_budget_current)
-                        updated_items.at[idx, 'Faiz'] = f"{percentage}%"
-                    
-                    st.subheader("📊 Yenilənmiş Cədvəl")
-                    st.dataframe(updated_items, use_container_width=True, hide_index=True)
+                st.subheader("📊 Yenilənmiş Cədvəl")
+                st.dataframe(cached_display_frame(region_data), use_container_width=True, hide_index=True)
+            
+            # Dəyişiklik tarixçəsi (audit)
+            with st.expander("🕘 Dəyişiklik Tarixçəsi", expanded=False):
+                history = journal.history()
+                if not history:
+                    st.info("📝 Bu sessiyada dəyişiklik edilməyib.")
+                else:
+                    st.dataframe(
+                        [
+                            {
+                                'Addım': position,
+                                'Vaxt': datetime.fromtimestamp(timestamp).strftime('%H:%M:%S'),
+                                'Dəyişiklik': summary,
+                                'Cari': "✅" if position == journal.position else "",
+                            }
+                            for position, timestamp, summary in reversed(history)
+                        ],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    # Keçmiş vəziyyət yalnız istənildikdə bərpa olunur (expander bağlı olsa da icra olunur)
+                    if st.checkbox("Keçmiş vəziyyətə bax", key=f"history_show_{region_to_edit}"):
+                        position = st.slider(
+                            "Vəziyyətə bax (addım):",
+                            min_value=journal.base,
+                            max_value=journal.end,
+                            value=journal.position,
+                            key=f"history_position_{region_to_edit}"
+                        ) if journal.end > journal.base else journal.base
+                        
+                        def past_state_view():
+                            past_state = journal.state_at(position)
+                            caption = (
+                                f"Addım {position}: büdcə {past_state.total_budget:,.2f} AZN, "
+                                f"{len(past_state)} maddə, istifadə edilən {past_state.used_amount:,.2f} AZN"
+                            )
+                            return caption, past_state.display_frame()
+                        
+                        caption, past_df = view_cache.get(
+                            'history', region_to_edit, region_data.version, past_state_view, position
+                        )
+                        st.caption(caption)
+                        st.dataframe(past_df, use_container_width=True, hide_index=True)
             
             # Rayonu tamamilə sil
             st.markdown("---")
             if st.button(f"🗑️ {region_to_edit} rayonunu tamamilə sil", key=f"delete_region_{region_to_edit}"):
-                del st.session_state.budget_data[region_to_edit]
-                st.success(f"✅ {region_to_edit} rayonu silindi!")
-                st.rerun()
+                def delete_region(region):
+                    del st.session_state.budget_data[region.name]
+                
+                is_valid, error_msg = st.session_state.budget_data.edit_region(region_to_edit, delete_region)
+                if is_valid:
+                    st.success(f"✅ {region_to_edit} rayonu silindi!")
+                    st.rerun()
+                else:
+                    st.error(error_msg)
     
     else:
         st.info("📝 Hələ heç bir məlumat mövcud deyil. Büdcə Planlaması tabından başlayın.")
 
-with tab3:
+with tab3, profiler.section("tab3"):
     st.header("📁 Excel Faylı İdarəetməsi")
     
     col1, col2 = st.columns(2)
@@ -352,48 +615,31 @@ with tab3:
         
         if st.session_state.budget_data:
             # Check if any region has non-empty items
-            has_data = any(not data['items'].empty for data in st.session_state.budget_data.values())
+            has_data = st.session_state.budget_data.has_items()
             
             if not has_data:
                 st.info("📝 İxrac etmək üçün məlumat mövcud deyil.")
             else:
-                # Excel faylı yaradılması
-                output = io.BytesIO()
-                
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    # Hər rayon üçün ayrı sheet
-                    for region, data in st.session_state.budget_data.items():
-                        if not data['items'].empty:
-                            # Maddələr cədvəli
-                            items_df = data['items'].copy()
-                            
-                            # Xülasə məlumatları əlavə et
-                            summary_data = {
-                                'Maddə Nömrəsi': ['', 'XÜLASƏ', 'Ümumi Büdcə', 'İstifadə Edilən', 'Qalan Büdcə'],
-                                'Maddənin Adı': ['', '', '', '', ''],
-                                'Məbləğ': ['', '', data['total_budget'], items_df['Məbləğ'].sum(), 
-                                         data['total_budget'] - items_df['Məbləğ'].sum()],
-                                'Faiz': ['', '', '100%', f"{calculate_percentage(items_df['Məbləğ'].sum(), data['total_budget'])}%", 
-                                       f"{100 - calculate_percentage(items_df['Məbləğ'].sum(), data['total_budget'])}%"]
-                            }
-                            
-                            summary_df = pd.DataFrame(summary_data)
-                            final_df = pd.concat([items_df, summary_df], ignore_index=True)
-                            
-                            final_df.to_excel(writer, sheet_name=region[:30], index=False)
-                
-                output.seek(0)
-                
-                # Fayl adı
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"Maliyye_Melumatları_{timestamp}.xlsx"
+                # Fayl yalnız düymə basıldıqda hazırlanır - dəyişməmiş rayonların vərəqləri keşdən
+                exporter = st.session_state.exporter
+                if st.button("📦 Excel Faylını Hazırla", key="prepare_export"):
+                    with st.spinner("Excel faylı hazırlanır..."):
+                        exporter.export(st.session_state.budget_data)
                 
-                st.download_button(
-                    label="📥 Excel Faylını Endir",
-                    data=output.getvalue(),
-                    file_name=filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                if exporter.workbook is not None:
+                    if not exporter.is_current(st.session_state.budget_data):
+                        st.warning("⚠️ Fayl hazırlandıqdan sonra məlumatlar dəyişib - ən son vəziyyət üçün faylı yenidən hazırlayın.")
+                    
+                    # Fayl adı
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    filename = f"Maliyye_Melumatları_{timestamp}.xlsx"
+                    
+                    st.download_button(
+                        label="📥 Excel Faylını Endir",
+                        data=exporter.workbook,
+                        file_name=filename,
+                        mime=EXCEL_MIME
+                    )
         else:
             st.info("📝 İxrac etmək üçün məlumat mövcud deyil.")
 
@@ -410,54 +656,381 @@ with tab3:
         
         if uploaded_file is not None:
             try:
-                # Excel faylını oxu
-                excel_file = pd.ExcelFile(uploaded_file)
-                
-                st.success(f"✅ Fayl yükləndi! Sheet-lər: {', '.join(excel_file.sheet_names)}")
+                # Yalnız vərəq adları oxunur, vərəqlər idxal zamanı bir dəfə oxunacaq
+                st.success(f"✅ Fayl yükləndi! Sheet-lər: {', '.join(sheet_names(uploaded_file))}")
                 
-                # Hər sheet üçün məlumatları yüklə
+                # İdxal arxa planda icra olunur
                 if st.button("📥 Məlumatları İdxal Et", key="import_data"):
-                    imported_count = 0
-                    
-                    for sheet_name in excel_file.sheet_names:
-                        try:
-                            df = pd.read_excel(uploaded_file, sheet_name=sheet_name)
-                            
-                            # Sütun adlarını yoxla
-                            required_columns = ['Maddə Nömrəsi', 'Maddənin Adı', 'Məbləğ']
-                            if all(col in df.columns for col in required_columns):
-                                # XÜLASƏ sətrlərini çıxar
-                                df_filtered = df[~df['Maddənin Adı'].isin(['', 'XÜLASƏ']) & 
-                                               df['Maddə Nömrəsi'].notna() & 
-                                               (df['Maddə Nömrəsi'] != '')]
-                                
-                                if not df_filtered.empty:
-                                    # Rayon məlumatlarını session state-ə əlavə et
-                                    region_name = sheet_name
-                                    
-                                    # Faizləri yenidən hesabla
-                                    total_budget = df_filtered['Məbləğ'].sum() * 1.1  # 10% ehtiyat
-                                    
-                                    for idx, row in df_filtered.iterrows():
-                                        amount = row['Məbləğ']
-                                        percentage = calculate_percentage(amount, total_budget)
-                                        df_filtered.at[idx, 'Faiz'] = f"{percentage}%"
-                                    
-                                    st.session_state.budget_data[region_name] = {
-                                        'total_budget': total_budget,
-                                        'items': df_filtered[required_columns + ['Faiz']].reset_index(drop=True)
-                                    }
-                                    
-                                    imported_count += 1
-                        
-                        except Exception as e:
-                            st.warning(f"⚠️ {sheet_name} sheet-i yüklənə bilmədi: {str(e)}")
+                    st.session_state.import_job = ImportJob(uploaded_file.getvalue()).start()
+            
+            except Exception as e:
+                st.error(f"❌ Fayl oxunarkən xəta baş verdi: {str(e)}")
+        
+        import_job = st.session_state.get('import_job')
+        if import_job is not None:
+            if not import_job.done:
+                st.progress(import_job.progress, text=f"İdxal olunur... {import_job.current_sheet}")
+                time.sleep(0.3)
+                st.rerun()
+            
+            del st.session_state.import_job
+            
+            for sheet, error in import_job.warnings:
+                st.warning(f"⚠️ {sheet} sheet-i yüklənə bilmədi: {error}")
+            
+            if import_job.error is not None:
+                st.error(f"❌ Fayl oxunarkən xəta baş verdi: {import_job.error}")
+            elif import_job.regions:
+                # Bütün rayonlar bir tranzaksiyada yazılır
+                st.session_state.budget_data.update(import_job.regions)
+                st.success(f"✅ {len(import_job.regions)} rayon məlumatı uğurla idxal edildi!")
+                st.rerun()
+            else:
+                st.error("❌ Heç bir uyğun məlumat tapılmadı!")        
+        st.markdown("---")
+        st.subheader("📚 Toplu İdxal (bir neçə fayl)")
+        
+        uploaded_files = st.file_uploader(
+            "Excel fayllarını seçin:",
+            type=['xlsx', 'xls'],
+            accept_multiple_files=True,
+            key="excel_bulk_upload"
+        )
+        
+        conflict_labels = {
+            'replace': "Sonuncu fayl əvvəlkini əvəz etsin",
+            'keep': "Mövcud məlumat saxlanılsın",
+            'merge': "Maddələr birləşdirilsin, büdcələr toplansın",
+        }
+        conflict_rule = st.selectbox(
+            "Eyni rayon bir neçə dəfə olduqda:",
+            options=CONFLICT_RULES,
+            format_func=conflict_labels.get,
+            key="bulk_conflict_rule"
+        )
+        
+        if uploaded_files and st.button("📥 Faylları İdxal Et", key="import_bulk_data"):
+            with st.spinner(f"{len(uploaded_files)} fayl paralel idxal olunur..."):
+                merged_regions, file_results = import_files(
+                    [(file.name, file.getvalue()) for file in uploaded_files],
+                    book=st.session_state.budget_data,
+                    conflict=conflict_rule
+                )
+            
+            # Hər fayl üzrə hesabat
+            st.dataframe(
+                [
+                    {
+                        'Fayl': result.name,
+                        'Rayonlar': len(result.regions),
+                        'Müddət (san)': round(result.seconds, 3),
+                        'Xəta': result.error or "; ".join(f"{sheet}: {error}" for sheet, error in result.warnings),
+                    }
+                    for result in file_results
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            if merged_regions:
+                st.success(f"✅ {len(merged_regions)} rayon məlumatı uğurla idxal edildi!")
+            else:
+                st.error("❌ Heç bir uyğun məlumat tapılmadı!")
+    
+    # Sürətli binar snapshot - bütün kitab bir Parquet faylında
+    st.markdown("---")
+    st.subheader("⚡ Snapshot (Parquet)")
+    
+    if not snapshot_available():
+        st.info("📝 Snapshot formatı üçün pyarrow quraşdırılmalıdır: `pip install pyarrow`")
+    else:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if not st.session_state.budget_data:
+                st.info("📝 Saxlamaq üçün məlumat mövcud deyil.")
+            elif st.button("📦 Snapshot Hazırla", key="prepare_snapshot"):
+                snapshot_data = io.BytesIO()
+                save_snapshot(st.session_state.budget_data, snapshot_data)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                st.download_button(
+                    label="📥 Snapshot-u Endir",
+                    data=snapshot_data.getvalue(),
+                    file_name=f"Maliyye_Snapshot_{timestamp}.parquet",
+                    mime=SNAPSHOT_MIME,
+                    key="download_snapshot"
+                )
+        
+        with col2:
+            snapshot_file = st.file_uploader(
+                "Snapshot faylını seçin:",
+                type=['parquet'],
+                key="snapshot_upload"
+            )
+            
+            if snapshot_file is not None:
+                try:
+                    # Yalnız rayonların siyahısı oxunur, maddələr seçimdən sonra
+                    available_regions = snapshot_regions(snapshot_file)
+                except Exception as e:
+                    st.error(f"❌ Fayl oxunarkən xəta baş verdi: {str(e)}")
+                else:
+                    item_counts = {name: count for name, _, count in available_regions}
+                    selected_regions = st.multiselect(
+                        "Yüklənəcək rayonlar (boş - hamısı):",
+                        options=list(item_counts),
+                        format_func=lambda name: f"{name} ({item_counts[name]} maddə)",
+                        key="snapshot_regions"
+                    )
                     
-                    if imported_count > 0:
-                        st.success(f"✅ {imported_count} rayon məlumatı uğurla idxal edildi!")
-                        st.rerun()
+                    if st.button("📥 Snapshot-dan Yüklə", key="load_snapshot"):
+                        loaded_regions = load_snapshot(snapshot_file, selected_regions or None)
+                        st.session_state.budget_data.update(loaded_regions)
+                        st.success(f"✅ {len(loaded_regions)} rayon snapshot-dan yükləndi!")
+
+with tab4, profiler.section("tab4"):
+    st.header("📈 Bütün Rayonlar üzrə Ümumi Baxış")
+    
+    # Göstəricilər hər dəyişiklikdə yenilənir, cədvəl və qrafiklər isə versiyaya görə keşlənir
+    book = st.session_state.budget_data
+    overview = view_cache.get('overview', '', book.aggregates.version, lambda: build_overview(book))
+    overview_df = overview['overview_df']
+    
+    if overview_df.empty:
+        st.info("📝 Hələ heç bir məlumat mövcud deyil. Büdcə Planlaması tabından başlayın.")
+    else:
+        totals = overview['totals']
+        used_percentage = totals['used_percentage']
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("💰 Ümumi Büdcə", f"{totals['total_budget']:,.2f} AZN")
+        
+        with col2:
+            st.metric("💸 İstifadə Edilən", f"{totals['used_amount']:,.2f} AZN", f"{used_percentage}%")
+        
+        with col3:
+            color = "normal" if totals['remaining_budget'] >= 0 else "inverse"
+            st.metric("💳 Qalan Büdcə", f"{totals['remaining_budget']:,.2f} AZN", delta_color=color)
+        
+        with col4:
+            st.metric("⚠️ Büdcəsi Aşılan Rayonlar", f"{totals['over_budget_count']} / {len(overview_df)}")
+        
+        # Qrafiklər
+        st.plotly_chart(overview['bar_chart'], use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("🥧 İstifadə Edilən Büdcənin Payı")
+            st.plotly_chart(overview['pie_chart'], use_container_width=True)
+        
+        with col2:
+            st.subheader("🏆 Ən Böyük Maddələr")
+            st.dataframe(overview['top_items_df'], use_container_width=True, hide_index=True)
+        
+        # Rayonlar üzrə cədvəl
+        st.subheader("📋 Rayonlar üzrə Xülasə")
+        st.dataframe(overview['display_df'], use_container_width=True, hide_index=True)
+        
+        # Bütün rayonlarda axtarış (indeks üzrə - yalnız uyğun rayonlar yoxlanılır)
+        st.subheader("🔎 Bütün Rayonlarda Axtarış")
+        global_query = st.text_input("Maddə nömrəsi və ya adı:", key="global_search")
+        if global_query.strip():
+            search_df = book.search(global_query.strip())
+            if search_df.empty:
+                st.info("🔍 Axtarışa uyğun maddə tapılmadı.")
+            else:
+                search_df['İndeks'] += 1
+                st.dataframe(
+                    search_df.rename(columns={'İndeks': 'Sıra'}),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.caption(f"Tapıldı: {len(search_df)} maddə, {search_df['Rayon'].nunique()} rayon")
+        
+        with st.expander("🧾 Maddə Nömrəsi üzrə Cəmlər", expanded=False):
+            shared_only = st.checkbox("Yalnız bir neçə rayonda olan nömrələr", key="rollup_shared_only")
+            rollup_df = book.rollup(min_regions=2 if shared_only else 1)
+            rollup_df['Məbləğ'] = rollup_df['Məbləğ'].map(lambda amount: f"{amount:,.2f} AZN")
+            st.dataframe(rollup_df, use_container_width=True, hide_index=True)
+
+with tab5, profiler.section("tab5"):
+    st.header("🧪 Ssenarilər (Nə olar?)")
+    
+    book = st.session_state.budget_data
+    scenarios = st.session_state.scenarios
+    
+    if not book:
+        st.info("📝 Hələ heç bir məlumat mövcud deyil. Büdcə Planlaması tabından başlayın.")
+    else:
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            st.subheader("➕ Yeni Ssenari")
+            scenario_name = st.text_input("Ssenarinin adı:", key="scenario_name")
+            if st.button("➕ Ssenari Yarat", key="create_scenario"):
+                if not scenario_name.strip():
+                    st.error("❌ Ssenarinin adını daxil edin!")
+                elif scenario_name.strip() in scenarios:
+                    st.error("❌ Bu adda ssenari artıq mövcuddur!")
+                else:
+                    scenarios[scenario_name.strip()] = Scenario(scenario_name.strip())
+                    st.rerun()
+        
+        with col2:
+            if scenarios:
+                st.subheader("✏️ Ssenarinin Addımları")
+                scenario = scenarios[st.selectbox("Ssenari:", options=list(scenarios), key="scenario_select")]
+                
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    step_op = st.selectbox(
+                        "Əməliyyat:",
+                        options=list(OPERATION_LABELS),
+                        format_func=OPERATION_LABELS.get,
+                        key="scenario_op"
+                    )
+                with col_b:
+                    step_regions = st.multiselect(
+                        "Rayonlar (boş - bütün rayonlar):",
+                        options=list(book.keys()),
+                        key="scenario_regions"
+                    )
+                
+                step_params = {}
+                if step_op in ('scale', 'budget'):
+                    step_params['percent'] = st.number_input(
+                        "Dəyişiklik (%, azalma üçün mənfi):", value=-10.0, step=1.0, key="scenario_percent"
+                    )
+                elif step_op == 'cap':
+                    step_params['amount'] = st.number_input(
+                        "Maksimum məbləğ (AZN):", min_value=0.0, value=1000.0, step=100.0,
+                        format="%.2f", key="scenario_cap"
+                    )
+                elif step_op == 'priority':
+                    prefixes = st.text_input(
+                        "Prioritet sırası (maddə nömrəsinin prefiksləri, vergüllə):",
+                        key="scenario_prefixes"
+                    )
+                    step_params['prefixes'] = [prefix.strip() for prefix in prefixes.split(",") if prefix.strip()]
+                
+                if st.button("➕ Addım Əlavə Et", key="add_scenario_step"):
+                    if step_op == 'priority' and not step_params['prefixes']:
+                        st.error("❌ Ən azı bir prefiks daxil edin!")
                     else:
-                        st.error("❌ Heç bir uyğun məlumat tapılmadı!")
+                        scenario.add_step(step_op, regions=step_regions or None, **step_params)
+                        st.rerun()
+                
+                for position, line in enumerate(scenario.describe()):
+                    col_a, col_b = st.columns([5, 1])
+                    with col_a:
+                        st.write(f"{position + 1}. {line}")
+                    with col_b:
+                        if st.button("🗑️", key=f"remove_step_{scenario.name}_{position}", help="Addımı sil"):
+                            scenario.remove_step(position)
+                            st.rerun()
+        
+        if scenarios:
+            st.markdown("---")
+            st.subheader("⚖️ Müqayisə")
             
-            except Exception as e:
-                st.error(f"❌ Fayl oxunarkən xəta baş verdi: {str(e)}")
\ No newline at end of file
+            compared = st.multiselect(
+                "Müqayisə ediləcək ssenarilər:",
+                options=list(scenarios),
+                default=list(scenarios),
+                key="compared_scenarios"
+            )
+            # Müqayisə bütün rayonları yükləyir - yalnız düymə ilə hesablanır və saxlanılır
+            comparison_key = (
+                tuple((name, tuple(scenarios[name].describe())) for name in compared),
+                book.aggregates.version,
+            )
+            if st.button("⚖️ Müqayisə Et", key="compare_scenarios_button"):
+                # Ssenarilər yalnız fərqləri saxlayır - rayon dəyişmədikcə yenidən hesablanmır
+                comparison_df = compare_scenarios(book, [scenarios[name] for name in compared])
+                comparison_chart = None
+                if compared:
+                    chart_df = comparison_df.melt(
+                        id_vars='Rayon',
+                        value_vars=['İstifadə Edilən'] + [f"{name}: İstifadə Edilən" for name in compared],
+                        var_name='Ssenari',
+                        value_name='Məbləğ (AZN)'
+                    )
+                    chart_df['Ssenari'] = chart_df['Ssenari'].str.replace(": İstifadə Edilən", "").replace(
+                        {'İstifadə Edilən': "Əsas"}
+                    )
+                    comparison_chart = px.bar(chart_df, x='Rayon', y='Məbləğ (AZN)', color='Ssenari', barmode='group')
+                st.session_state.scenario_comparison = (comparison_key, comparison_df, comparison_chart)
+            
+            if 'scenario_comparison' in st.session_state:
+                saved_key, comparison_df, comparison_chart = st.session_state.scenario_comparison
+                if saved_key != comparison_key:
+                    st.warning("⚠️ Müqayisədən sonra məlumatlar və ya ssenarilər dəyişib - yenidən müqayisə edin.")
+                st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+                if comparison_chart is not None:
+                    st.plotly_chart(comparison_chart, use_container_width=True)
+            
+            st.markdown("---")
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                apply_name = st.selectbox("Tətbiq ediləcək ssenari:", options=list(scenarios), key="apply_scenario_select")
+            with col2:
+                st.write("")
+                apply_clicked = st.button("✅ Ssenarini Tətbiq Et", key="apply_scenario")
+            
+            if apply_clicked:
+                outcomes = scenarios[apply_name].apply(book)
+                failed = [(name, error_msg) for name, is_valid, error_msg in outcomes if not is_valid]
+                st.session_state.editor_version += 1
+                # Nəticə yenidən icradan sonra göstərilir - digər tablar yeni məlumatla qurulsun
+                st.session_state.scenario_outcome = (len(outcomes) - len(failed), failed)
+                st.rerun()
+            
+            scenario_outcome = st.session_state.pop("scenario_outcome", None)
+            if scenario_outcome is not None:
+                applied_count, failed = scenario_outcome
+                for name, error_msg in failed:
+                    st.error(f"❌ {name}: {error_msg}")
+                st.success(
+                    f"✅ {applied_count} rayona tətbiq edildi! "
+                    "Hər rayonda dəyişiklik \"↩️ Geri al\" ilə ləğv edilə bilər."
+                )
+
+# Debug paneli - keş statistikası və rerun müddəti
+rerun_seconds = time.perf_counter() - RERUN_STARTED
+st.session_state.rerun_times.append(rerun_seconds)
+
+if DEBUG:
+    with st.sidebar.expander("🛠️ Debug", expanded=True):
+        cache_stats = view_cache.stats()
+        rerun_times = st.session_state.rerun_times
+        st.metric("Keş isabəti", f"{cache_stats['hit_rate']:.0%}")
+        st.write(
+            f"Keş: {cache_stats['entries']}/{cache_stats['max_entries']} element, "
+            f"{cache_stats['hits']} isabət, {cache_stats['misses']} qaçırma, "
+            f"{cache_stats['evictions']} çıxarılma"
+        )
+        st.write(
+            f"Rerun: {rerun_seconds * 1000:.1f} ms "
+            f"(son {len(rerun_times)} rerun üzrə orta: {sum(rerun_times) / len(rerun_times) * 1000:.1f} ms)"
+        )
+
+if PROFILE:
+    profile = profiler.record()
+    st.session_state.rerun_profiles.append(profile)
+    with st.sidebar.expander("⏱️ Profil", expanded=True):
+        rss = profile['rss']
+        st.write(
+            f"Rerun: {profile['total'] * 1000:.1f} ms"
+            + (f", pik RSS: {rss / 1024 / 1024:.0f} MB" if rss is not None else "")
+        )
+        st.dataframe(summarize(st.session_state.rerun_profiles), use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 Ölçüləri yüklə (JSON)",
+            data=json.dumps(list(st.session_state.rerun_profiles)),
+            file_name=f"rerun_profil_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            key="download_profile"
+        )
@@ -0,0 +1,31 @@
+"""Əmr sətri: doğrulama çıxışı və yüngül başlanğıc"""
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+from maliyye import BudgetBook
+from maliyye.cli import check_book
+
+
+def test_check_book_writes_errors_to_err_stream():
+    book = BudgetBook()
+    book.get_or_create("Bakı", 100.0).add_item("1", "Kağız", 10.0)
+    over = book.get_or_create("Quba", 100.0)
+    over.add_item("1", "Kağız", 50.0)
+    over.total_qepik = 1000
+
+    out, err = io.StringIO(), io.StringIO()
+    assert check_book(book, out=out, err=err) == 1
+    assert out.getvalue().startswith("OK    Bakı:")
+    assert "XƏTA  Quba:" in out.getvalue()
+    assert err.getvalue().startswith("Quba: ")
+
+
+def test_parser_does_not_import_pandas():
+    code = "import sys; from maliyye.cli import build_parser; build_parser(); print('pandas' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    assert result.stdout.strip() == "False"
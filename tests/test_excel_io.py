@@ -0,0 +1,73 @@
+"""Excel ixracı: idxalla qarşılıqlı çevrilmə, vərəq adları və vərəq keşi"""
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from maliyye import BudgetBook, WorkbookExporter
+from maliyye.excel_io import import_workbook, region_sheet_rows, unique_sheet_names
+
+
+def region_items(region):
+    return list(zip(region.numbers.tolist(), region.names.tolist(), region.amounts.tolist()))
+
+
+@pytest.fixture
+def book():
+    book = BudgetBook()
+    baku = book.get_or_create("Bakı", 1000.0)
+    baku.add_item("1.1", "Kağız & <qələm>", 12.34)
+    baku.add_item("1.2", "Printer", 250.0)
+    baku.add_item("2", "Mürəkkəb", 0.01)
+    book.get_or_create("Gəncə", 500.0).add_item("1.1", "Kağız", 40.0)
+    # Boş rayon ixrac edilmir
+    book.get_or_create("Quba", 100.0)
+    return book
+
+
+def test_export_round_trips_through_import(book):
+    regions, warnings = import_workbook(io.BytesIO(WorkbookExporter().export(book)))
+    assert warnings == []
+    assert list(regions) == ["Bakı", "Gəncə"]
+    for name, region in regions.items():
+        assert region_items(region) == region_items(book[name])
+        assert region.total_qepik == book[name].total_qepik
+
+
+def test_sheets_declare_their_dimension(book):
+    workbook = load_workbook(io.BytesIO(WorkbookExporter().export(book)), read_only=True)
+    try:
+        worksheet = workbook["Bakı"]
+        rows = region_sheet_rows(book["Bakı"])
+        assert (worksheet.max_row, worksheet.max_column) == (len(rows), len(rows[0]))
+    finally:
+        workbook.close()
+
+
+def test_sheet_names_are_sanitized_and_unique():
+    long_name = "Rayon " + "x" * 40
+    titles = unique_sheet_names(["A/B", "A:B", "a?b", long_name, long_name + "y", "'Quba'"])
+    assert titles[:3] == ["A_B", "A_B (2)", "a_b (3)"]
+    assert titles[3] == long_name[:30]
+    assert titles[4] == long_name[:26] + " (2)"
+    assert titles[5] == "Quba"
+    assert all(len(title) <= 30 for title in titles)
+
+
+def test_export_with_clashing_sheet_names_opens(book):
+    book.get_or_create("Bakı/Mərkəz", 100.0).add_item("1", "Kağız", 1.0)
+    book.get_or_create("Bakı:Mərkəz", 100.0).add_item("1", "Qələm", 2.0)
+    regions, _ = import_workbook(io.BytesIO(WorkbookExporter().export(book)))
+    assert list(regions) == ["Bakı", "Gəncə", "Bakı_Mərkəz", "Bakı_Mərkəz (2)"]
+    assert region_items(regions["Bakı_Mərkəz (2)"]) == [("1", "Qələm", 200)]
+
+
+def test_sheet_cache_is_bounded(book):
+    exporter = WorkbookExporter(max_cache_bytes=1)
+    exporter.export(book)
+    assert len(exporter._sheets) <= 1
+    # Keşdən atılan vərəqlər növbəti ixracda yenidən hazırlanır
+    book["Gəncə"].add_item("2", "Qələm", 1.0)
+    regions, _ = import_workbook(io.BytesIO(exporter.export(book)))
+    for name, region in regions.items():
+        assert region_items(region) == region_items(book[name])
@@ -0,0 +1,94 @@
+"""BookIndex: axtarış, təkrar nömrələr və kitab dəyişiklikləri ilə sinxronluq"""
+import pytest
+
+from maliyye import BookIndex, BudgetBook, SqliteStore
+
+
+def test_edit_of_region_deleted_elsewhere_is_a_conflict(tmp_path):
+    store = SqliteStore(str(tmp_path / "budget.db"))
+    first, second = BudgetBook(store), BudgetBook(store)
+    first.get_or_create("Bakı", 100.0).add_item("1", "Kağız", 1.0)
+    second["Bakı"]
+    second.item_index()
+    del first["Bakı"]
+
+    is_valid, error_msg = second.edit_region("Bakı", lambda region: region.add_item("2", "Qələm", 1.0))
+    assert not is_valid and "Bakı" in error_msg
+    assert "Bakı" not in second
+    assert second.duplicates("Bakı", "1") == (0, {})
+    assert second.aggregates.frame().empty
+
+
+def rebuilt(book):
+    """Kitabın cari maddələrindən sıfırdan qurulmuş indeks"""
+    index = BookIndex()
+    index.build(
+        (region.name, number, item_name, amount)
+        for region in book.values()
+        for number, item_name, amount in zip(region.numbers, region.names, region.amounts.tolist())
+    )
+    return index
+
+
+def assert_matches_rebuild(book):
+    index, expected = book.item_index(), rebuilt(book)
+    assert index.numbers == expected.numbers
+    assert index.tokens == expected.tokens
+
+
+@pytest.fixture(params=["session", "store"])
+def book(request, tmp_path):
+    store = SqliteStore(str(tmp_path / "budget.db")) if request.param == "store" else None
+    book = BudgetBook(store)
+    for name in ("Bakı", "Gəncə"):
+        region = book.get_or_create(name, 1000.0)
+        for i in range(4):
+            region.add_item(f"1.{i}", f"Kağız məhsulu {i}", 10.0 + i)
+    book.item_index()
+    return book
+
+
+def test_incremental_index_matches_rebuild(book):
+    region = book["Bakı"]
+    region.add_item("2.1", "Qələm dəsti", 5.0)
+    assert_matches_rebuild(book)
+    region.update_item(0, "1.3", "Mürəkkəb", 7.0)
+    assert_matches_rebuild(book)
+    region.delete_item(1)
+    assert_matches_rebuild(book)
+    region.apply_edits({0: ("3.1", "Printer kağızı", 8.0)}, deletions=[2])
+    assert_matches_rebuild(book)
+    region.apply_amounts([0, 1], [100, 200])
+    assert_matches_rebuild(book)
+    journal = book.journal("Bakı")
+    while journal.undo():
+        assert_matches_rebuild(book)
+    while journal.redo():
+        assert_matches_rebuild(book)
+    del book["Gəncə"]
+    assert_matches_rebuild(book)
+
+
+def test_store_index_is_shared_between_sessions(tmp_path):
+    store = SqliteStore(str(tmp_path / "budget.db"))
+    first, second = BudgetBook(store), BudgetBook(store)
+    first.get_or_create("Bakı", 100.0).add_item("1", "Kağız", 1.0)
+    assert second.item_index() is first.item_index()
+    assert second.duplicates("Sumqayıt", "1") == (0, {"Bakı": 1})
+
+    first["Bakı"].add_item("1", "Kağız", 1.0)
+    assert second.duplicates("Sumqayıt", "1") == (0, {"Bakı": 2})
+
+
+def test_store_index_picks_up_writes_from_other_processes(tmp_path):
+    path = str(tmp_path / "budget.db")
+    book = BudgetBook(SqliteStore(path))
+    book.get_or_create("Bakı", 100.0).add_item("1", "Kağız", 1.0)
+    book.item_index()
+    # Eyni bazaya ayrıca bağlantı ilə yazan başqa proses
+    other = BudgetBook(SqliteStore(path))
+    other["Bakı"].add_item("1", "Kağız", 1.0)
+    other.get_or_create("Gəncə", 100.0).add_item("1", "Qələm", 1.0)
+    assert book.duplicates("Sumqayıt", "1") == (0, {"Bakı": 2, "Gəncə": 1})
+    del other["Gəncə"]
+    assert book.duplicates("Sumqayıt", "1") == (0, {"Bakı": 2})
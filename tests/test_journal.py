@@ -0,0 +1,104 @@
+"""RegionJournal: keçmiş vəziyyətlərin bərpası, sıxılma və geri al / təkrarla"""
+import pytest
+
+from maliyye import RegionBudget, RegionJournal
+
+
+def region_state(region):
+    return (
+        region.total_qepik,
+        region.numbers.tolist(),
+        region.names.tolist(),
+        region.amounts.tolist(),
+    )
+
+
+def make_history(steps, **journal_options):
+    """`steps` dəyişiklik edilmiş rayon, jurnal və hər mövqedəki vəziyyət"""
+    region = RegionBudget("Bakı", 1_000_000.0)
+    journal = RegionJournal(region, **journal_options)
+    region.listeners.append(journal)
+    states = [region_state(region)]
+    for step in range(steps):
+        if step % 5 == 4 and len(region) > 1:
+            region.delete_item(step % len(region))
+        elif step % 5 == 3 and len(region):
+            region.update_item(0, f"u{step}", f"Yenilənmiş {step}", 5.0 + step)
+        elif step % 7 == 6:
+            region.set_total_budget(1_000_000.0 + step)
+        else:
+            region.add_item(str(step), f"Maddə {step}", 1.0 + step)
+        states.append(region_state(region))
+    return region, journal, states
+
+
+def test_state_at_matches_every_recorded_position():
+    region, journal, states = make_history(40, snapshot_every=7)
+    for position in range(journal.base, journal.end + 1):
+        assert region_state(journal.state_at(position)) == states[position]
+
+
+def test_state_at_after_compaction():
+    region, journal, states = make_history(120, snapshot_every=5, max_entries=30)
+    assert journal.base > 0
+    assert len(journal) <= 30 + 5
+    assert min(journal.snapshots) == journal.base
+    for position in range(journal.base, journal.end + 1):
+        assert region_state(journal.state_at(position)) == states[position]
+    with pytest.raises(IndexError):
+        journal.state_at(journal.base - 1)
+
+
+def test_undo_redo_after_compaction():
+    region, journal, states = make_history(120, snapshot_every=5, max_entries=30)
+    while journal.can_undo():
+        assert journal.undo()
+        assert region_state(region) == states[journal.position]
+    assert journal.position == journal.base
+    while journal.can_redo():
+        assert journal.redo()
+        assert region_state(region) == states[journal.position]
+    assert region_state(region) == states[-1]
+
+
+def test_new_change_discards_redo():
+    region, journal, states = make_history(10)
+    journal.undo()
+    journal.undo()
+    region.add_item("new", "Yeni", 1.0)
+    assert not journal.can_redo()
+    assert journal.end == journal.position == 9
+    assert region_state(journal.state_at(8)) == states[8]
+
+
+def test_batch_is_one_step():
+    region, journal, _ = make_history(3)
+    before = region_state(region)
+    region.apply_edits({0: ("a", "A", 2.0), 1: ("b", "B", 3.0)}, deletions=[2])
+    assert journal.end == 4
+    journal.undo()
+    assert region_state(region) == before
+
+
+@pytest.mark.parametrize("change", [
+    lambda region: region.delete_item(1),
+    lambda region: region.update_item(0, "x", "X", 9.0),
+    lambda region: region.set_total_budget(500.0),
+    lambda region: region.apply_edits({0: ("a", "A", 2.0)}, deletions=[2]),
+    lambda region: region.apply_amounts([0, 1], [700, 800]),
+])
+def test_base_snapshot_is_taken_on_first_change(change):
+    region = RegionBudget("Bakı", 1000.0)
+    for i in range(3):
+        region.add_item(str(i), f"Maddə {i}", 1.0 + i)
+    before = region_state(region)
+    journal = RegionJournal(region)
+    region.listeners.append(journal)
+    assert journal.snapshots == {}
+    assert region_state(journal.state_at(0)) == before
+
+    change(region)
+    assert list(journal.snapshots) == [0]
+    assert region_state(journal.state_at(0)) == before
+    journal.undo()
+    assert region_state(region) == before
@@ -0,0 +1,47 @@
+"""Pul hesabının invariantları: bölüşdürülən faizlər və məbləğlər cəmə dəqiq bərabərdir"""
+import numpy as np
+import pytest
+
+from maliyye.money import allocate, allocate_shares, share, to_qepik
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_allocate_shares_sums_to_share_of_sum(seed):
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(0, 10_000_000, rng.integers(1, 200))
+    total = int(amounts.sum()) + int(rng.integers(0, 10_000_000))
+    shares = allocate_shares(amounts, total)
+    assert int(shares.sum()) == share(int(amounts.sum()), total)
+    assert (shares >= 0).all()
+
+
+def test_allocate_shares_rounds_thirds_to_full_share():
+    shares = allocate_shares([1, 1, 1], 3)
+    assert shares.tolist() == [3334, 3333, 3333]
+
+
+def test_allocate_shares_without_budget_is_zero():
+    assert allocate_shares([100, 200], 0).tolist() == [0, 0]
+    assert allocate_shares([], 100).tolist() == []
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_allocate_sums_to_total(seed):
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(0, 10**12, rng.integers(1, 500))
+    total = int(rng.integers(0, 10**14))
+    result = allocate(total, weights)
+    assert result.dtype == np.int64
+    assert int(result.sum()) == (total if weights.sum() > 0 else 0)
+    assert (result >= 0).all()
+
+
+def test_allocate_is_proportional():
+    assert allocate(100, [1, 1, 2]).tolist() == [25, 25, 50]
+    assert allocate(10, [1, 1, 1]).tolist() == [4, 3, 3]
+
+
+def test_to_qepik_rounds_half_away_from_zero():
+    assert to_qepik(1.005) == 101
+    assert to_qepik(-1.005) == -101
+    assert to_qepik(0.1 + 0.2) == 30
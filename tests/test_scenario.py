@@ -0,0 +1,117 @@
+"""Ssenarilər: prioritet sırası, maksimum məbləğ, büdcəyə uyğunlaşdırma və tətbiq"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from maliyye import BudgetBook, RegionBudget, Scenario
+from maliyye.scenario import cap_amounts, fit_amounts, prioritize_amounts, priority_levels
+
+
+def make_region(name, total_budget, items):
+    region = RegionBudget(name, total_budget)
+    numbers, amounts = zip(*items)
+    region.add_items(pd.DataFrame({
+        'Maddə Nömrəsi': list(numbers),
+        'Maddənin Adı': [f"Maddə {number}" for number in numbers],
+        'Məbləğ': list(amounts),
+    }))
+    return region
+
+
+def region_state(region):
+    return region.total_qepik, region.amounts.tolist()
+
+
+@pytest.fixture
+def book():
+    book = BudgetBook()
+    book["Bakı"] = make_region("Bakı", 1000.0, [("1.1", 300.0), ("1.2", 200.0), ("2.1", 250.55), ("3", 100.0)])
+    book["Quba"] = make_region("Quba", 500.0, [("1", 100.0), ("2", 400.0)])
+    return book
+
+
+def test_priority_levels_follow_prefix_order():
+    levels = priority_levels(["1.1", "2.3", "3", "21", "12"], ["2", "1"])
+    assert levels.tolist() == [1, 0, 2, 0, 1]
+
+
+def test_priority_funds_groups_in_order():
+    amounts = np.array([300, 200, 400, 100, 50], dtype=np.int64)
+    levels = np.array([1, 1, 0, 2, 1])
+    result = prioritize_amounts(amounts, levels, 650)
+    # 0-cı qrup tam, 1-ci qrup qalan 250 qəpiklə mütənasib, 2-ci qrup sıfır
+    assert result[2] == 400
+    assert result[[0, 1, 4]].sum() == 250
+    assert result[[0, 1, 4]].tolist() == [136, 91, 23]
+    assert result[3] == 0
+    assert result.sum() == 650
+
+
+def test_priority_keeps_amounts_within_budget():
+    amounts = np.array([300, 200], dtype=np.int64)
+    assert prioritize_amounts(amounts, np.array([1, 0]), 500) is amounts
+
+
+def test_priority_step_in_scenario(book):
+    scenario = Scenario("Prioritet")
+    scenario.add_step('budget', percent=-30, regions=["Bakı"])
+    scenario.add_step('priority', prefixes=["2", "1"], regions=["Bakı"])
+    amounts = scenario.amounts(book["Bakı"])
+    # 700 AZN: 2.1 tam, 1.x qalanı 3:2 nisbətində bölüşür, 3 maliyyələşmir
+    assert amounts.tolist() == [26967, 17978, 25055, 0]
+    assert amounts.sum() == 70000
+    assert scenario.diff(book["Quba"]).indices.size == 0
+
+
+def test_cap_limits_every_item():
+    amounts = np.array([30000, 20000, 25055, 10000], dtype=np.int64)
+    assert cap_amounts(amounts, 25000).tolist() == [25000, 20000, 25000, 10000]
+
+
+def test_cap_step_in_scenario(book):
+    scenario = Scenario("Limit")
+    scenario.add_step('cap', amount=250)
+    assert scenario.amounts(book["Bakı"]).tolist() == [25000, 20000, 25000, 10000]
+    assert scenario.amounts(book["Quba"]).tolist() == [10000, 25000]
+
+
+def test_fit_scales_down_to_budget_exactly():
+    amounts = np.array([30000, 20000, 25055, 10000], dtype=np.int64)
+    result = fit_amounts(amounts, 80000)
+    assert result.sum() == 80000
+    assert (result <= amounts).all()
+    assert fit_amounts(amounts, 100000) is amounts
+
+
+def test_budget_cut_then_fit(book):
+    scenario = Scenario("Kəsir")
+    scenario.add_step('budget', percent=-10)
+    scenario.add_step('fit')
+    total_qepik, used_qepik, _ = scenario.region_totals(book["Quba"])
+    assert total_qepik == used_qepik == 45000
+    # Bakı 900 AZN büdcəyə onsuz da sığır
+    assert scenario.region_totals(book["Bakı"])[1] == book["Bakı"].used_qepik
+
+
+def test_apply_writes_one_undoable_step_per_region(book):
+    before = {name: region_state(book[name]) for name in book.keys()}
+    ends = {name: book.journal(name).end for name in book.keys()}
+    scenario = Scenario("Kəsir")
+    scenario.add_step('budget', percent=-10)
+    scenario.add_step('fit')
+    expected = {name: scenario.amounts(book[name]).tolist() for name in book.keys()}
+
+    assert scenario.apply(book) == [("Bakı", True, ""), ("Quba", True, "")]
+    for name in book.keys():
+        assert book[name].amounts.tolist() == expected[name]
+        assert book.journal(name).end == ends[name] + 1
+        assert book.journal(name).undo()
+        assert region_state(book[name]) == before[name]
+
+
+def test_apply_skips_regions_outside_the_scenario(book):
+    scenario = Scenario("Limit")
+    scenario.add_step('cap', amount=150, regions=["Quba"])
+    assert scenario.apply(book) == [("Quba", True, "")]
+    assert book.journal("Bakı").end == 0
+    assert book["Quba"].amounts.tolist() == [10000, 15000]
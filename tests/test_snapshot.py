@@ -0,0 +1,76 @@
+"""Snapshot formatı: yazma/yükləmə, seçilmiş rayonlar, boş rayonlar və mətn sütunları"""
+import io
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from maliyye import BudgetBook, load_snapshot, save_snapshot  # noqa: E402
+from maliyye.snapshot import snapshot_regions  # noqa: E402
+
+
+def region_state(region):
+    return region.total_qepik, region.numbers.tolist(), region.names.tolist(), region.amounts.tolist()
+
+
+@pytest.fixture
+def book():
+    book = BudgetBook()
+    baku = book.get_or_create("Bakı", 1000.0)
+    baku.add_item("1.1", "Kağız", 12.34)
+    baku.add_item("1.2", "Printer", 250.0)
+    book.get_or_create("Gəncə", 500.0).add_item("2", "Qələm", 40.0)
+    book.get_or_create("Quba", 100.0)
+    return book
+
+
+def saved(book, regions=None):
+    target = io.BytesIO()
+    save_snapshot(book, target, regions)
+    return io.BytesIO(target.getvalue())
+
+
+def test_round_trip_keeps_order_budgets_and_items(book, tmp_path):
+    path = str(tmp_path / "book.parquet")
+    save_snapshot(book, path)
+    loaded = load_snapshot(path)
+    assert list(loaded) == ["Bakı", "Gəncə", "Quba"]
+    for name, region in loaded.items():
+        assert region_state(region) == region_state(book[name])
+
+
+def test_empty_regions_are_kept(book):
+    loaded = load_snapshot(saved(book))
+    assert loaded["Quba"].empty
+    assert loaded["Quba"].total_qepik == 10000
+    assert snapshot_regions(saved(book)) == [("Bakı", 1000.0, 2), ("Gəncə", 500.0, 1), ("Quba", 100.0, 0)]
+
+
+def test_selected_regions(book):
+    source = saved(book)
+    assert list(load_snapshot(source, ["Quba", "Gəncə"])) == ["Gəncə", "Quba"]
+    assert region_state(load_snapshot(saved(book), ["Gəncə"])["Gəncə"]) == region_state(book["Gəncə"])
+
+    partial = load_snapshot(saved(book, ["Bakı", "Yoxdur"]))
+    assert list(partial) == ["Bakı"]
+
+
+def test_non_string_item_numbers_are_saved_as_text():
+    book = BudgetBook()
+    region = book.get_or_create("Bakı", 1000.0)
+    region.add_item(12, "Kağız", 1.0)
+    region.add_item(1.5, 7, 2.0)
+    loaded = load_snapshot(saved(book))["Bakı"]
+    assert loaded.numbers.tolist() == ["12", "1.5"]
+    assert loaded.names.tolist() == ["Kağız", "7"]
+    assert loaded.amounts.tolist() == [100, 200]
+
+
+def test_rejects_other_parquet_files():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    target = io.BytesIO()
+    pq.write_table(pa.table({'a': [1]}), target)
+    with pytest.raises(ValueError):
+        load_snapshot(io.BytesIO(target.getvalue()))
@@ -0,0 +1,75 @@
+"""SqliteStore: maddə mövqelərinin sürüşdürülməsi və RegionBudget ilə sinxronluq"""
+import pytest
+
+from maliyye import BudgetBook, SqliteStore
+
+
+def stored_items(store, name):
+    total_qepik, buffer = store.load_region(name)
+    return list(zip(buffer.numbers.tolist(), buffer.names.tolist(), buffer.amounts.tolist()))
+
+
+def region_items(region):
+    return list(zip(region.numbers.tolist(), region.names.tolist(), region.amounts.tolist()))
+
+
+@pytest.fixture
+def book(tmp_path):
+    book = BudgetBook(store=SqliteStore(str(tmp_path / "budget.db")))
+    region = book.get_or_create("Bakı", 1000.0)
+    for i in range(5):
+        region.add_item(str(i), f"Maddə {i}", 10.0 + i)
+    return book
+
+
+@pytest.mark.parametrize("idx", [0, 2, 5])
+def test_insert_item_shifts_following_positions(book, idx):
+    store = book.store
+    expected = stored_items(store, "Bakı")
+    store.insert_item("Bakı", idx, "new", "Yeni", 777)
+    expected.insert(idx, ("new", "Yeni", 777))
+    assert stored_items(store, "Bakı") == expected
+
+
+@pytest.mark.parametrize("idx", [0, 2, 4])
+def test_delete_item_shifts_following_positions(book, idx):
+    store = book.store
+    expected = stored_items(store, "Bakı")
+    store.delete_item("Bakı", idx)
+    del expected[idx]
+    assert stored_items(store, "Bakı") == expected
+
+
+def test_region_changes_are_written_through(book):
+    region = book["Bakı"]
+    region.delete_item(1)
+    region.update_item(0, "0a", "Dəyişdi", 12.5)
+    region.add_item("9", "Son", 1.0)
+    assert stored_items(book.store, "Bakı") == region_items(region)
+    assert book.store.region_stats(["Bakı"]) == [("Bakı", region.total_qepik, region.used_qepik, len(region))]
+
+
+def test_undo_redo_round_trip_through_store(book):
+    region = book["Bakı"]
+    journal = book.journal("Bakı")
+    states = [region_items(region)]
+    region.delete_item(2)
+    states.append(region_items(region))
+    region.update_item(0, "x", "Yeniləndi", 50.0)
+    states.append(region_items(region))
+    region.apply_edits({1: ("y", "Toplu", 1.0)}, deletions=[3])
+    states.append(region_items(region))
+
+    for expected in reversed(states[:-1]):
+        assert journal.undo()
+        assert region_items(region) == expected
+        assert stored_items(book.store, "Bakı") == expected
+
+    for expected in states[1:]:
+        assert journal.redo()
+        assert region_items(region) == expected
+        assert stored_items(book.store, "Bakı") == expected
+    assert not journal.redo()
+
+    # Başqa sessiya (yeni kitab) eyni vəziyyəti görür
+    assert region_items(BudgetBook(store=book.store)["Bakı"]) == states[-1]